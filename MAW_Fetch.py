@@ -1,5 +1,16 @@
+import codecs
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urlparse
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+import instrumentation
+
+logger = logging.getLogger(__name__)
 
 class MAWFetcher:
 
@@ -30,24 +41,209 @@ class MAWFetcher:
         return self._cover_dates
 
     def fetch(self):
+        # Every fetch starts from a clean slate so repeated calls don't accumulate duplicates
+        self._issues = []
+        self._cover_dates = []
+        for issue_number, cover_date in self.iter_issues():
+            self._issues.append(issue_number)
+            self._cover_dates.append(cover_date)
+
+    def iter_issues(self):
+        # Timed until the last row is parsed, since the page is streamed rather than read up front
+        with instrumentation.timer("maw_fetch_seconds"):
+            with requests.post(MAWFetcher.url, data=MAWFetcher.build_post_data(self.seriesid), stream=True) as response:
+                instrumentation.count("maw_requests_total", status=str(response.status_code))
+                if response.status_code != 200:
+                    logger.error(f"Failed to make the POST request. Status code: {response.status_code}")
+                    return
+                yield from MAWFetcher.parse_stream(response.iter_content(chunk_size=16384), response.encoding)
 
-        POST_data = {
-            "seriesid": {self.seriesid},
+    @staticmethod
+    def build_post_data(sid):
+        return {
+            "seriesid": sid,
             "sortField": "date",
             "sortDir": "ASC"
         }
 
-        response = requests.post(MAWFetcher.url, data=POST_data)
-
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.content, "html.parser")
-            rows = soup.find_all("tr")
-            for row in rows:
-                columns = row.find_all("td")
-                if len(columns) >= 2:
-                    issue_number = columns[0].text.strip()
-                    cover_date = columns[1].text.strip()
-                    self._issues.append(issue_number)
-                    self._cover_dates.append(cover_date)
-        else:
-            print(f"Failed to make the POST request. Status code: {response.status_code}")
\ No newline at end of file
+    @staticmethod
+    def parse_stream(chunks, encoding=None):
+        decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+        parser = MAWIssueParser()
+        for chunk in chunks:
+            parser.feed(decoder.decode(chunk))
+            yield from parser.pop_rows()
+        parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+        yield from parser.pop_rows()
+
+
+# Collects the first two cells of each row of the series issues table: the table with class "seriesissues",
+# or failing that one whose header row has a "Cover Date" column; navigation and footer rows are skipped
+class MAWIssueParser(HTMLParser):
+
+    ISSUES_TABLE_CLASS = "seriesissues"
+    ISSUES_TABLE_HEADER = "cover date"
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._rows = []
+        self._tables = []
+
+    def pop_rows(self):
+        rows = self._rows
+        self._rows = []
+        return rows
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            if self._tables:
+                self._tables[-1]["nested"] = True
+            classes = (dict(attrs).get("class") or "").split()
+            self._tables.append({"cells": None, "cell": None, "nested": False, "header": None,
+                                 "issues": MAWIssueParser.ISSUES_TABLE_CLASS in classes})
+        elif not self._tables:
+            return
+        elif tag == "tr":
+            self._end_row()
+            self._tables[-1].update(cells=[], cell=None, nested=False)
+        elif tag == "td":
+            table = self._tables[-1]
+            self._end_cell()
+            if table["cells"] is not None:
+                table["cell"] = []
+        elif tag == "th":
+            self._tables[-1]["header"] = []
+
+    def handle_endtag(self, tag):
+        if not self._tables:
+            return
+        if tag == "td":
+            self._end_cell()
+        elif tag == "th":
+            self._end_header()
+        elif tag == "tr":
+            self._end_row()
+        elif tag == "table":
+            self._end_row()
+            self._tables.pop()
+
+    def handle_data(self, data):
+        if not self._tables:
+            return
+        table = self._tables[-1]
+        if table["cell"] is not None:
+            table["cell"].append(data)
+        elif table["header"] is not None:
+            table["header"].append(data)
+
+    def _end_header(self):
+        table = self._tables[-1]
+        if table["header"] is not None and "".join(table["header"]).strip().lower() == MAWIssueParser.ISSUES_TABLE_HEADER:
+            table["issues"] = True
+        table["header"] = None
+
+    def _end_cell(self):
+        table = self._tables[-1]
+        if table["cell"] is not None:
+            table["cells"].append("".join(table["cell"]).strip())
+            table["cell"] = None
+
+    def _end_row(self):
+        self._end_cell()
+        self._end_header()
+        table = self._tables[-1]
+        cells = table["cells"]
+        if cells is not None and table["issues"] and not table["nested"] and len(cells) >= 2:
+            self._rows.append((cells[0], cells[1]))
+        table["cells"] = None
+
+
+# Spaces out requests to the same host so no host sees more than rate requests per second
+class HostRateLimiter:
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class MAWBulkFetcher:
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, url=None, max_workers=8, rate=2.0, max_retries=3, backoff=1.0, timeout=60):
+        self.url = url or MAWFetcher.url
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.rate_limiter = HostRateLimiter(rate)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def fetch_all(self, sids, on_result=None):
+        # Returns {sid: [(issue, cover_date), ...]} for the successful SIDs and one stats dict per SID
+        results = {}
+        stats = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for sid, rows, sid_stats in executor.map(self.fetch_one, sids):
+                if rows is not None:
+                    results[sid] = rows
+                    if on_result:
+                        on_result(sid, rows)
+                stats.append(sid_stats)
+        return results, stats
+
+    def fetch_one(self, sid):
+        start = time.perf_counter()
+        error = None
+        rows = None
+        attempt = 0
+
+        while True:
+            attempt += 1
+            retry_after = None
+            self.rate_limiter.wait(self.url)
+            try:
+                with instrumentation.timer("maw_fetch_seconds"), self.session.post(self.url, data=MAWFetcher.build_post_data(sid), stream=True, timeout=self.timeout) as response:
+                    instrumentation.count("maw_requests_total", status=str(response.status_code))
+                    if response.status_code == 200:
+                        rows = list(MAWFetcher.parse_stream(response.iter_content(chunk_size=16384), response.encoding))
+                        error = None
+                        break
+                    error = f"Status code: {response.status_code}"
+                    if response.status_code not in MAWBulkFetcher.RETRY_STATUSES:
+                        break
+                    retry_after = response.headers.get("Retry-After")
+            except requests.exceptions.RequestException as e:
+                error = str(e)
+
+            if attempt > self.max_retries:
+                break
+            time.sleep(self._get_retry_delay(attempt, retry_after))
+
+        return sid, rows, {
+            "sid": sid,
+            "seconds": time.perf_counter() - start,
+            "attempts": attempt,
+            "rows": len(rows) if rows is not None else 0,
+            "error": error
+        }
+
+    def _get_retry_delay(self, attempt, retry_after):
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        # Exponential backoff with full jitter
+        return random.uniform(0, self.backoff * (2 ** (attempt - 1)))
@@ -1,6 +1,144 @@
-import msal
+import base64
+import json
+import logging
+import os
+import threading
+import time
 from flask import request, redirect, url_for, session, render_template
 import app_config
+import storage
+
+logger = logging.getLogger(__name__)
+
+
+# One MSAL application and token cache per process, shared by every session and background job
+class TokenProvider:
+
+    REFRESH_MARGIN = getattr(app_config, "TOKEN_REFRESH_MARGIN_SECONDS", 600)
+    # Holds refresh tokens for every user, so the directory and file are only readable by the app's own account
+    CACHE_ROOT = getattr(app_config, "TOKEN_CACHE_ROOT", "TokenCache")
+    CACHE_PATH = os.path.join(CACHE_ROOT, "token_cache.bin") if CACHE_ROOT else None
+
+    _apps = {}
+    _cache = None
+    _cache_mtime = None
+    _http_cache = {}
+    _tokens = {}
+    _account_locks = {}
+    _lock = threading.RLock()
+
+    @staticmethod
+    def get_cache():
+        # msal is imported on first use, so starting a worker does not wait for it
+        with TokenProvider._lock:
+            if TokenProvider._cache is None:
+                import msal
+                TokenProvider._cache = msal.SerializableTokenCache()
+            return TokenProvider._cache
+
+    @staticmethod
+    def get_msal_app(authority=None):
+        # Authority discovery is done once per process and kept in the shared http_cache
+        authority = authority or app_config.AUTHORITY
+        with TokenProvider._lock:
+            if authority not in TokenProvider._apps:
+                import msal
+                TokenProvider.reload_cache()
+                TokenProvider._apps[authority] = msal.ConfidentialClientApplication(
+                    app_config.CLIENT_ID, authority=authority,
+                    client_credential=app_config.CLIENT_SECRET,
+                    token_cache=TokenProvider.get_cache(),
+                    http_cache=TokenProvider._http_cache)
+            return TokenProvider._apps[authority]
+
+    @staticmethod
+    def get_token(account_id, scopes=None, force_refresh=False):
+        # Serves the last token until it is within REFRESH_MARGIN of expiring, then refreshes silently.
+        # A refresh only holds its own account's lock, so other users' calls are not held up by the network round trip
+        with TokenProvider._lock:
+            token = TokenProvider._get_cached_token(account_id, force_refresh)
+            if token:
+                return token
+            account_lock = TokenProvider._account_locks.setdefault(account_id, threading.Lock())
+
+        with account_lock:
+            with TokenProvider._lock:
+                # Another thread may have refreshed this account while we waited
+                token = TokenProvider._get_cached_token(account_id, force_refresh)
+                if token:
+                    return token
+                cca = TokenProvider.get_msal_app()
+                TokenProvider.reload_cache()
+                account = TokenProvider.get_account(account_id)
+            if account is None:
+                return None
+
+            scopes = scopes or app_config.SCOPE
+            result = cca.acquire_token_silent(scopes, account=account, force_refresh=force_refresh)
+            if result and result.get("expires_in", 0) <= TokenProvider.REFRESH_MARGIN and not force_refresh:
+                result = cca.acquire_token_silent(scopes, account=account, force_refresh=True) or result
+            if not result or "access_token" not in result:
+                logger.warning(f"Silent token acquisition failed: {(result or {}).get('error_description')}")
+                return None
+
+            with TokenProvider._lock:
+                TokenProvider._tokens[account_id] = (result["access_token"], time.time() + int(result.get("expires_in", 0)))
+                TokenProvider.save_cache()
+            return result["access_token"]
+
+    @staticmethod
+    def _get_cached_token(account_id, force_refresh=False):
+        cached = TokenProvider._tokens.get(account_id)
+        if cached and not force_refresh and cached[1] - time.time() > TokenProvider.REFRESH_MARGIN:
+            return cached[0]
+        return None
+
+    @staticmethod
+    def for_account(account_id):
+        # A callable for code that outlives the request, e.g. GraphClient inside a background job
+        def get_token(force_refresh=False):
+            return TokenProvider.get_token(account_id, force_refresh=force_refresh)
+        return get_token
+
+    @staticmethod
+    def get_account(account_id):
+        for account in TokenProvider.get_msal_app().get_accounts():
+            if account["home_account_id"] == account_id:
+                return account
+        return None
+
+    @staticmethod
+    def remove_account(account_id):
+        with TokenProvider._lock:
+            TokenProvider._tokens.pop(account_id, None)
+            account = TokenProvider.get_account(account_id)
+            if account is not None:
+                TokenProvider.get_msal_app().remove_account(account)
+                TokenProvider.save_cache()
+
+    @staticmethod
+    def reload_cache():
+        # Other worker processes may have refreshed tokens since we last read the file
+        if not TokenProvider.CACHE_PATH or not os.path.exists(TokenProvider.CACHE_PATH):
+            return
+        mtime = os.path.getmtime(TokenProvider.CACHE_PATH)
+        if mtime != TokenProvider._cache_mtime:
+            with open(TokenProvider.CACHE_PATH, "r", encoding="utf-8") as cache_file:
+                TokenProvider.get_cache().deserialize(cache_file.read())
+            TokenProvider._cache_mtime = mtime
+
+    @staticmethod
+    def save_cache():
+        with TokenProvider._lock:
+            cache = TokenProvider.get_cache()
+            if not TokenProvider.CACHE_PATH or not cache.has_state_changed:
+                return
+            os.makedirs(TokenProvider.CACHE_ROOT, mode=0o700, exist_ok=True)
+            # write_atomic creates the file with 0600, and the rename keeps those permissions
+            storage.write_atomic(TokenProvider.CACHE_PATH, lambda cache_file: cache_file.write(cache.serialize()))
+            cache.has_state_changed = False
+            TokenProvider._cache_mtime = os.path.getmtime(TokenProvider.CACHE_PATH)
+
 
 class AuthManager:
 
@@ -15,54 +153,58 @@ class AuthManager:
     def login(self):
         session["flow"] = self._build_auth_code_flow(scopes=app_config.SCOPE)
         return render_template("login.html", auth_uri=session["flow"]["auth_uri"])
-      
+
     def authorized(self):
         try:
-            cache = self._load_cache()
-            result = self._build_msal_app(cache=cache).acquire_token_by_auth_code_flow(
-                session.get("flow", {}), request.args)
+            cca = self._build_msal_app()
+            result = cca.acquire_token_by_auth_code_flow(session.get("flow", {}), request.args)
             if "error" in result:
-                print(f"Authorization error: {result['error']}")
+                logger.warning(f"Authorization error: {result['error']}")
                 return render_template("auth_error.html", result=result)
+            # Only the cached account this token was issued to may back the session, never another user's
+            account_id = self._get_home_account_id(result)
+            if not any(account["home_account_id"] == account_id for account in cca.get_accounts()):
+                logger.warning("Authorization error: no cached account matches the signed-in user")
+                return render_template("auth_error.html", result={
+                    "error": "account_mismatch",
+                    "error_description": "The signed-in account could not be found in the token cache."})
             session["user"] = result.get("id_token_claims")
-            session["access_token"] = result["access_token"]            
-            self._save_cache(cache)
+            session["access_token"] = result["access_token"]
+            session["account_id"] = account_id
+            TokenProvider.save_cache()
         except Exception as e:
-            print(f"Exception during authentication: {str(e)}")
-            pass 
+            logger.error(f"Exception during authentication: {str(e)}")
+            pass
         return redirect(url_for("index"))
-    
+
     def logout(self):
+        if session.get("account_id"):
+            TokenProvider.remove_account(session["account_id"])
         session.clear()  # Wipe out user and its token cache from session
         return redirect(  # Also logout from your tenant's web session
             app_config.AUTHORITY + "/oauth2/v2.0/logout" +
             "?post_logout_redirect_uri=" + url_for("index", _external=True))
-    
-    def _build_msal_app(self, cache=None, authority=None):
-        return msal.ConfidentialClientApplication(
-        app_config.CLIENT_ID, authority=authority or app_config.AUTHORITY,
-        client_credential=app_config.CLIENT_SECRET, token_cache=cache)
+
+    @staticmethod
+    def _get_home_account_id(result):
+        # MSAL derives home_account_id from client_info; for Azure AD accounts the id token's oid and tid give the same value
+        if result.get("client_info"):
+            client_info = json.loads(base64.urlsafe_b64decode(result["client_info"] + "=" * (-len(result["client_info"]) % 4)))
+            return f"{client_info['uid']}.{client_info['utid']}"
+        claims = result.get("id_token_claims") or {}
+        if claims.get("oid") and claims.get("tid"):
+            return f"{claims['oid']}.{claims['tid']}"
+        return None
+
+    def _build_msal_app(self, authority=None):
+        return TokenProvider.get_msal_app(authority=authority)
 
     def _build_auth_code_flow(self, authority=None, scopes=None):
         return self._build_msal_app(authority=authority).initiate_auth_code_flow(
             scopes or [],
             redirect_uri=url_for("authorized", _external=True))
-    
-    def _load_cache(self):
-        cache = msal.SerializableTokenCache()
-        if session.get("token_cache"):
-            cache.deserialize(session["token_cache"])
-        return cache
-
-    def _save_cache(self, cache):
-        if cache.has_state_changed:
-            session["token_cache"] = cache.serialize()
 
     def _get_token_from_cache(self, scope=None):
-        cache = self._load_cache()  # This web app maintains one cache per session
-        cca = self._build_msal_app(cache=cache)
-        accounts = cca.get_accounts()
-        if accounts:  # So all account(s) belong to the current signed-in user
-            result = cca.acquire_token_silent(scope, account=accounts[0])
-            self._save_cache(cache)
-            return result
\ No newline at end of file
+        if session.get("account_id"):
+            return TokenProvider.get_token(session["account_id"], scopes=scope)
+        return None
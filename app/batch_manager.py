@@ -0,0 +1,129 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import logging
+import time
+import requests
+import pandas as pd
+from app.graph_client import GraphClient
+import instrumentation
+
+logger = logging.getLogger(__name__)
+
+
+class BatchManager:
+
+    # Graph rejects $batch payloads with more than 20 sub-requests
+    BATCH_SIZE = 20
+
+    def __init__(self, access_token, graph_url=None, max_workers=4, max_retries=3):
+        self.client = GraphClient(access_token, graph_url)
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+
+    def execute(self, sub_requests, on_batch=None):
+        # Returns one response dict per sub-request, in the order they were given
+        chunks = [sub_requests[i:i + BatchManager.BATCH_SIZE] for i in range(0, len(sub_requests), BatchManager.BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._send_batch, chunk) for chunk in chunks]
+            if on_batch:
+                for future in as_completed(futures):
+                    on_batch(future.result())
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def _send_batch(self, chunk):
+        # Sub-requests throttled inside the batch are resent on their own after their Retry-After
+        results = [None] * len(chunk)
+        pending = list(range(len(chunk)))
+        attempt = 0
+
+        while pending:
+            attempt += 1
+            responses = self._post_batch([chunk[i] for i in pending])
+            throttled = []
+            retry_after = 0.0
+            for i, result in zip(pending, responses):
+                results[i] = result
+                if result["status"] in GraphClient.THROTTLE_STATUSES:
+                    instrumentation.count("graph_throttled_total", endpoint="$batch sub-request")
+                if result["status"] in GraphClient.THROTTLE_STATUSES and attempt <= self.max_retries:
+                    throttled.append(i)
+                    retry_after = max(retry_after, result["retry_after"] or 1.0)
+            pending = throttled
+            if pending:
+                GraphClient.rate_limiter.on_throttle(retry_after)
+                time.sleep(retry_after)
+
+        for result in results:
+            result.pop("retry_after", None)
+        return results
+
+    def _post_batch(self, chunk):
+        payload = {
+            "requests": [dict(sub_request, id=str(i)) for i, sub_request in enumerate(chunk)]
+        }
+
+        try:
+            # Retrying a whole batch is safe: moves are idempotent and folder creation fails on conflict
+            response = self.client.post("/$batch", json=payload, idempotent=True)
+            response.raise_for_status()
+            responses = {item["id"]: item for item in response.json().get("responses", [])}
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error(f"Batch request failed: {e}")
+            return [{"status": None, "body": None, "error": str(e), "retry_after": None} for _ in chunk]
+
+        results = []
+        for i in range(len(chunk)):
+            item = responses.get(str(i))
+            if item is None:
+                results.append({"status": None, "body": None, "error": "Missing response in batch", "retry_after": None})
+                continue
+            body = item.get("body")
+            error = None
+            if not 200 <= item.get("status", 0) < 300:
+                error = (body or {}).get("error", {}).get("message", f"Status code: {item.get('status')}")
+            retry_after = (item.get("headers") or {}).get("Retry-After")
+            results.append({
+                "status": item.get("status"),
+                "body": body,
+                "error": error,
+                "retry_after": float(retry_after) if retry_after and str(retry_after).isdigit() else None
+            })
+        return results
+
+    def move_files(self, final_data, progress=None):
+        sub_requests = []
+        for file_id, destination_id in zip(final_data["File ID"], final_data["Destination ID"]):
+            sub_requests.append({
+                "method": "PATCH",
+                "url": f"/me/drive/items/{file_id}",
+                "body": {
+                    "parentReference": {
+                        "id": f"{destination_id}"
+                    }
+                },
+                "headers": {"Content-Type": "application/json"}
+            })
+
+        on_batch = None
+        if progress:
+            progress.add_total(len(sub_requests))
+            on_batch = lambda chunk_results: progress.advance(
+                done=sum(result["error"] is None for result in chunk_results),
+                failed=sum(result["error"] is not None for result in chunk_results)
+            )
+
+        results = self.execute(sub_requests, on_batch=on_batch)
+        instrumentation.count("files_moved_total", sum(result["error"] is None for result in results), outcome="moved")
+        instrumentation.count("files_moved_total", sum(result["error"] is not None for result in results), outcome="failed")
+        return pd.DataFrame({
+            "File ID": final_data["File ID"].tolist(),
+            "Destination ID": final_data["Destination ID"].tolist(),
+            "Status": [result["status"] for result in results],
+            "Error": [result["error"] for result in results]
+        })
+
+    @staticmethod
+    def get_failed_moves(move_results):
+        return move_results[move_results["Error"].notna()]
@@ -1,29 +1,76 @@
+import importlib
 import json
-import msal
-from flask import Flask, request, redirect, url_for, session, render_template
-import requests
-from tool_suite import CoverDateCorrector
-import pandas as pd
+import logging
+from flask import Response, request, redirect, url_for, session, render_template, g, jsonify, stream_with_context
+from app.auth_manager import TokenProvider
+from app.state_manager import StateManager
+from app.job_manager import JobManager
 import app_config
 
+# pandas, tool_suite and the Graph managers are imported inside the tool routes that use them,
+# so login and the index page do not pay for them; warm_up() loads them all up front instead
+
+logger = logging.getLogger(__name__)
+
 
 class ComicBookManagerApp:
     
     def __init__(self, app):
         self.app = app
-        self.cdc = CoverDateCorrector()
+        self.state_manager = StateManager()
+        self.job_manager = JobManager()
+        self._tools_loaded = False
+
+    def load_tools(self):
+        if self._tools_loaded:
+            return
+        from tool_suite import MAWCache
+        MAWCache.configure(
+            ttl_days=getattr(app_config, "MAW_CACHE_TTL_DAYS", None),
+            series_ttl_days=getattr(app_config, "MAW_CACHE_SERIES_TTL_DAYS", None),
+            stale_while_revalidate=getattr(app_config, "MAW_CACHE_STALE_WHILE_REVALIDATE", None),
+            memory_size=getattr(app_config, "MAW_CACHE_MEMORY_SIZE", None)
+        )
+        self._tools_loaded = True
+
+    def warm_up(self):
+        # For preforked workers: import everything the tool routes use before the first request arrives
+        for module in ("app.batch_manager", "app.drive_index_manager", "app.folder_tree_manager"):
+            importlib.import_module(module)
+        self.load_tools()
+        TokenProvider.get_cache()
+
+    @property
+    def cdc(self):
+        # Each session gets its own corrector, loaded once per request and saved after it
+        if "cdc" not in g:
+            self.load_tools()
+            g.cdc = self.state_manager.load_corrector()
+        return g.cdc
+
+    def save_workflow_state(self, response):
+        if "cdc" in g:
+            self.state_manager.save_corrector(g.cdc)
+        return response
 
     def register_routes(self):
+        self.app.after_request(self.save_workflow_state)
         self.app.add_url_rule("/", "index", self.index)
         self.app.add_url_rule("/tools", "tools", self.tools)
         self.app.add_url_rule("/tools/cover_date_corrector", "cover_date_corrector", self.cover_date_corrector, methods=['GET', 'POST'])
         self.app.add_url_rule("/tools/cover_date_corrector/finalize", "cover_date_corrector_finalize", self.cover_date_corrector_finalize, methods=['GET', 'POST', 'PATCH'])
         self.app.add_url_rule("/tools/monthly_package_generator", "create_monthly_package_folder_structure", self.create_monthly_package_folder_structure, methods=['GET', 'POST'])
+        self.app.add_url_rule("/tools/cover_date_corrector/data/<table>", "cover_date_corrector_data", self.cover_date_corrector_data)
+        self.app.add_url_rule("/tools/cover_date_corrector/drive_data/search", "search_drive_data", self.search_drive_data)
+        self.app.add_url_rule("/tools/cover_date_corrector/drive_data/remove", "remove_drive_entries", self.remove_drive_entries, methods=['POST'])
+        self.app.add_url_rule("/jobs/<job_id>", "job_status_page", self.job_status_page)
+        self.app.add_url_rule("/jobs/<job_id>/status", "job_status", self.job_status)
     
     def index(self):
         if not self.check_for_user():
             return redirect(url_for("login"))
-        self.cdc.reset_corrector()
+        self.state_manager.clear_corrector()
+        g.pop("cdc", None)
         return render_template('index.html', user=session["user"])
     
     def tools(self):
@@ -32,6 +79,7 @@ class ComicBookManagerApp:
         return render_template('tool_menu.html')
     
     def cover_date_corrector(self):
+        import pandas as pd
         MAW_data = pd.DataFrame()
         has_approved_data=False
         drive_data = pd.DataFrame()
@@ -49,7 +97,7 @@ class ComicBookManagerApp:
                 MAW_data = self.cdc.load_initial_MAW_data()
             
             elif filter_term:
-                MAW_data=self.cdc.add_filter_to_MAW_data(filter_term)
+                MAW_data=self.cdc.add_filter_to_MAW_data(filter_term, is_regex="filter_is_regex" in request.form)
             
             elif "fetch_button" in request.form:
                 MAW_data=self.cdc.maw_data.fetch_MAW_data()
@@ -60,223 +108,226 @@ class ComicBookManagerApp:
             
             elif search_term:
                 has_approved_data=True
-                drive_data = self.cdc_fetch_graph_data(search_term)
-                self.cdc.drive_data.set_folder_data(self.create_comic_folder_structure(self.cdc_get_monthly_packages_folder_id()))
+                drive_data = self.cdc_fetch_graph_data(search_term, live_search="live_search" in request.form)
+                self.load_comic_folder_structure(self.cdc_get_monthly_packages_folder_id())
             
-            elif "remove_entry" in request.form:
+            elif "show_drive_button" in request.form:
                 has_approved_data=True
-                file_name = request.form.get("remove_entry")
-                if file_name:
-                    drive_data = self.cdc.drive_data.remove_entry_from_drive_data(file_name)
-                    print(drive_data)
-            
-            elif "remove_all_after" in request.form:
+                drive_data = self.cdc.drive_data.get_active_data()
+
+            elif "rebuild_tree_button" in request.form:
                 has_approved_data=True
-                index = request.form.get("remove_all_after")
-                if index:
-                    index = int(index)
-                    drive_data = self.cdc.drive_data.remove_all_entries_after(index)
+                drive_data = self.cdc.drive_data.get_active_data()
+                self.load_comic_folder_structure(self.cdc_get_monthly_packages_folder_id(), force_rebuild=True)
             
             elif "approve_drive_button" in request.form:
                 return redirect(url_for("cover_date_corrector_finalize"))
 
         return render_template('cover_date_corrector.html', data=MAW_data, approved_data=has_approved_data, drive_data=drive_data)
 
+    def cover_date_corrector_data(self, table):
+        if not self.check_for_user():
+            return jsonify({"error": "Not signed in"}), 401
+        from tool_suite import CoverDateCorrector
+
+        # Read-only, so the state is loaded without marking it for saving after the request
+        cdc = self.state_manager.load_corrector()
+        tables = {
+            "maw": cdc.maw_data.get_active_MAW_data(),
+            "drive": cdc.drive_data.get_active_data()
+        }
+        if table not in tables:
+            return jsonify({"error": "Unknown table"}), 404
+
+        offset = max(request.args.get("offset", 0, type=int), 0)
+        limit = min(max(request.args.get("limit", 50, type=int), 1), 500)
+        sort = request.args.get("sort")
+        descending = request.args.get("desc", 0, type=int) == 1
+        return jsonify(CoverDateCorrector.get_data_page(tables[table], offset, limit, sort, descending))
+
+    def remove_drive_entries(self):
+        if not self.check_for_user():
+            return jsonify({"error": "Not signed in"}), 401
+
+        actions = request.get_json(silent=True) or {}
+        if actions.get("file_ids"):
+            self.cdc.drive_data.remove_entries_by_id(actions["file_ids"])
+        if actions.get("remove_all_after"):
+            self.cdc.drive_data.remove_all_entries_after(actions["remove_all_after"])
+        return jsonify({"total": len(self.cdc.drive_data.get_active_data())})
+
     def cover_date_corrector_finalize(self):
+        from tool_suite import CoverDateCorrector
         preview_data = self.cdc.create_preview_data()
 
         if request.method == 'POST':
             publisher = request.form.get("publisher")
-            final_data = self.cdc.create_final_data(publisher)
-            for index, row in final_data.iterrows():
-                print(row)
-                url = f"https://graph.microsoft.com/v1.0/me/drive/items/{row['File ID']}"
-                payload = {
-                    "parentReference":{
-                        "id": f"{row['Destination ID']}"
-                    }
-                }
-                headers = {
-                    "Authorization": "Bearer " + session.get("access_token"),
-                    "Content-Type": "application/json"
-                }
-
-                try:
-                    response = requests.patch(url, data=json.dumps(payload), headers=headers)
-                    response.raise_for_status()  # Raise an exception if the response status code is not 2xx
-                    print("File Moved")
-                except requests.exceptions.RequestException as e:
-                    print(f"PATCH request failed: {e}")
-                    return "OPERATION FAILED"
-            return redirect(url_for("index"))
-
-        return render_template('cover_date_corrector_preview.html', data=preview_data)
+            plan, unresolved_data = self.cdc.create_move_plan(publisher)
+            if not unresolved_data.empty or "plan_button" in request.form:
+                return render_template('cover_date_corrector_preview.html', data=preview_data, unresolved_data=unresolved_data if not unresolved_data.empty else None, unmatched_files=self.cdc.unmatched_files, unmatched_issues=self.cdc.unmatched_issues, plan=plan, plan_summary=CoverDateCorrector.get_plan_summary(plan, unresolved_data), publisher=publisher)
+            # Files already in their month folder, and moves that would collide on a name, are never sent
+            final_data = CoverDateCorrector.get_final_data(plan, include_review="include_review" in request.form)
+            job_id = self.job_manager.submit("move_files", self.get_user_id(), ComicBookManagerApp.run_move_job, self.get_access_token(), final_data)
+            return redirect(url_for("job_status_page", job_id=job_id))
+
+        return render_template('cover_date_corrector_preview.html', data=preview_data, unresolved_data=None, unmatched_files=self.cdc.unmatched_files, unmatched_issues=self.cdc.unmatched_issues, plan=None, plan_summary=None, publisher=None)
 
     def check_for_user(self):
-        if session.get("user") and session.get("access_token"):
-            return True
-        return False
-    
-    def cdc_fetch_graph_data(self, search_term):
-        url = "https://graph.microsoft.com/v1.0/me/drive/root/search(q='%s')?select=name,parentReference,id" % (search_term)
-        result = []
-        
-        while True:
-            graph_data = requests.get(url, headers={'Authorization': 'Bearer ' + session.get("access_token")})
-            
-            if graph_data.status_code == 200:
-                data = graph_data.json()
-                result.extend(data['value'])
-                next_link = data.get("@odata.nextLink")
-
-                print(next_link)
-                if next_link:
-                    url = next_link
-                else:
-                    break
-            else:
-                print(graph_data)
-                break
-        return self.cdc.drive_data.parse_graph_response_to_data_frame(result)
+        if not session.get("user"):
+            return False
+        # The provider callable is always truthy; ask it for a token so a revoked account is sent back to login
+        access_token = self.get_access_token()
+        if callable(access_token):
+            access_token = access_token()
+        return bool(access_token)
+
+    def get_access_token(self):
+        # Prefer the refreshing token provider so long jobs outlive the session's original token
+        if session.get("account_id"):
+            return TokenProvider.for_account(session["account_id"])
+        return session.get("access_token")
+
+    def get_user_id(self):
+        return session["user"].get("oid", "anonymous")
     
+    def cdc_fetch_graph_data(self, search_term, live_search=False):
+        for _ in self.cdc.drive_data.ingest_graph_pages(self.cdc_iter_graph_pages(search_term, live_search)):
+            pass
+        return self.cdc.drive_data.get_active_data()
+
+    def cdc_iter_graph_pages(self, search_term, live_search=False):
+        import requests
+        from app.drive_index_manager import DriveIndexManager
+        from app.graph_client import GraphClient
+        # Answered from the local drive index unless a live search is asked for or the index cannot sync
+        if not live_search and getattr(app_config, "DRIVE_INDEX_ENABLED", True):
+            drive_index = DriveIndexManager(self.get_access_token(), self.get_user_id())
+            result = drive_index.search(search_term)
+            if result is not None:
+                yield {"value": result}
+                return
+            if not drive_index.is_ready():
+                self.start_drive_index_sync()
+
+        url = "/me/drive/root/search(q='%s')?select=name,parentReference,id" % (search_term)
+        try:
+            yield from GraphClient(self.get_access_token()).prefetch_pages(url)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error(f"Error searching drive: {e}")
+
+    def start_drive_index_sync(self):
+        # A full pass over a large drive takes minutes, so it runs as a job while searches go to Graph
+        from app.drive_index_manager import DriveIndexManager
+        if self.job_manager.get_active_job("drive_index_sync", self.get_user_id(), max_age=DriveIndexManager.BUILD_JOB_TIMEOUT) is None:
+            self.job_manager.submit("drive_index_sync", self.get_user_id(), ComicBookManagerApp.run_drive_index_sync_job, self.get_access_token(), self.get_user_id())
+
+    def search_drive_data(self):
+        if not self.check_for_user():
+            return jsonify({"error": "Not signed in"}), 401
+
+        search_term = request.args.get("search_criteria", "")
+        live_search = request.args.get("live_search", 0, type=int) == 1
+        cdc = self.cdc
+
+        def generate():
+            # One JSON line per page so the browser can show results before the search has finished
+            total = 0
+            for frame in cdc.drive_data.ingest_graph_pages(self.cdc_iter_graph_pages(search_term, live_search)):
+                total += len(frame)
+                rows = frame.astype(object).where(frame.notna(), None).to_dict("records")
+                yield json.dumps({"rows": rows, "total": total}) + "\n"
+
+            self.load_comic_folder_structure(self.cdc_get_monthly_packages_folder_id())
+            # The response has already gone out, so the after_request hook has saved the state from before the search
+            self.state_manager.save_corrector(cdc)
+            yield json.dumps({"done": True, "total": len(cdc.drive_data.get_active_data())}) + "\n"
+
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
     def cdc_get_monthly_packages_folder_id(self):
-        url = "https://graph.microsoft.com/v1.0/me/drive/root/search(q='Monthly%20Packages')"
-        graph_data = requests.get(url, headers={'Authorization': 'Bearer ' + session.get("access_token")})
+        from app.graph_client import GraphClient
+        if session.get("monthly_packages_id"):
+            return self.cdc.drive_data.set_monthly_packages_id(session["monthly_packages_id"])
+
+        url = "/me/drive/root/search(q='Monthly%20Packages')"
+        graph_data = GraphClient(self.get_access_token()).get(url)
 
         if graph_data.status_code == 200:
             data = graph_data.json()
-            return self.cdc.drive_data.parse_graph_response_to_monthly_package_folder_id(data['value'])
+            session["monthly_packages_id"] = self.cdc.drive_data.parse_graph_response_to_monthly_package_folder_id(data['value'])
+            return session["monthly_packages_id"]
         else:
-            print("Error getting folder ID")
+            logger.error("Error getting folder ID")
 
     def create_monthly_package_folder_structure(self):
-        base_url = "https://graph.microsoft.com/v1.0/me/drive"
-        headers = {
-            "Authorization": "Bearer " + session.get("access_token"),
-            "Content-Type": "application/json"
-        }
+        if not self.check_for_user():
+            return redirect(url_for("login"))
 
-        start_year = 1960
-        end_year = 2023
-
-        years = list(range(start_year, end_year + 1))
-
-        months = {
-            1: "01 - January",
-            2: "02 - February",
-            3: "03 - March",
-            4: "04 - April",
-            5: "05 - May",
-            6: "06 - June",
-            7: "07 - July",
-            8: "08 - August",
-            9: "09 - September",
-            10: "10 - October",
-            11: "11 - November",
-            12: "12 - December"
-        }
+        if request.method == "POST":
+            from tool_suite import MonthlyPackageGenerator
+            self.load_tools()
+            generator = MonthlyPackageGenerator(
+                request.form.get("publisher"),
+                start_year=request.form.get("start_year") or 1960,
+                end_year=request.form.get("end_year") or None
+            )
+            root_folder_id = self.cdc_get_monthly_packages_folder_id()
+            folder_dict = self.load_comic_folder_structure(root_folder_id)
+            job_id = self.job_manager.submit("monthly_package_generator", self.get_user_id(), ComicBookManagerApp.run_generator_job, self.get_access_token(), generator, folder_dict)
+            return redirect(url_for("job_status_page", job_id=job_id))
 
-        # Iterate through years
-        for year in years:
-            # Create a folder for the year
-            year_folder_name = str(year)
-            year_folder_url = base_url + "/root/children"
-            year_payload = {
-                "name": year_folder_name,
-                "folder": {}
-            }
-
-            year_response = requests.post(year_folder_url, data=json.dumps(year_payload), headers=headers)
-            year_folder_id = year_response.json()["id"]
-
-            # Iterate through months
-            for month_id, month_name in months.items():
-                month_folder_name = f"{month_name}"
-                month_folder_url = f"{base_url}/items/{year_folder_id}/children"
-                month_payload = {
-                    "name": month_folder_name,
-                    "folder": {}
-                }
-
-                requests.post(month_folder_url, data=json.dumps(month_payload), headers=headers)
+        return render_template('monthly_package_generator.html')
         
-        return redirect(url_for("index"))
-        
-    def create_comic_folder_structure(self, root_folder_id):
-        # Initialize the root folder structure
-        root = {
-            'folder_id': root_folder_id,
-            'subfolders': {}
+    @staticmethod
+    def run_move_job(progress, access_token, final_data):
+        from app.batch_manager import BatchManager
+        move_results = BatchManager(access_token).move_files(final_data, progress=progress)
+        failed_moves = BatchManager.get_failed_moves(move_results)
+        return {
+            "moved": len(move_results) - len(failed_moves),
+            "failed": failed_moves[["File ID", "Error"]].values.tolist()
         }
-        
-        # Use the Microsoft Graph API to list the contents of the root folder
-        folder_contents = self.get_folder_contents(root_folder_id)
-        
-        # Recursively process each item in the root folder
-        for item in folder_contents:
-            if "folder" in item:
-                # If the item is a folder, create a subfolder structure
-                folder_id = item['id']
-                folder_name = item['name']
-                root['subfolders'][folder_name] = self.create_publisher_structure(folder_id)
 
-        return self.cdc.drive_data.set_folder_data(root)
+    @staticmethod
+    def run_drive_index_sync_job(progress, access_token, user_id):
+        from app.drive_index_manager import DriveIndexManager
+        if not DriveIndexManager(access_token, user_id).sync(max_age=0, progress=progress):
+            raise RuntimeError("Drive index sync failed")
+        return {"synced": True}
 
-    def create_publisher_structure(self, publisher_folder_id):
-        # Initialize the publisher folder structure
-        publisher = {
-            'folder_id': publisher_folder_id,
-            'subfolders': {}
-        }
+    @staticmethod
+    def run_generator_job(progress, access_token, generator, folder_dict):
+        from app.batch_manager import BatchManager
+        return generator.generate(folder_dict, BatchManager(access_token), progress=progress)
 
-        # Retrieve the contents of the publisher folder
-        publisher_contents = self.get_folder_contents(publisher_folder_id)
-
-        # Process each item in the publisher folder
-        for item in publisher_contents:
-            if "folder" in item:
-                # If the item is a folder, create a year structure
-                folder_id = item['id']
-                folder_name = item['name']
-                year = folder_name
-                publisher['subfolders'][year] = self.create_year_structure(folder_id)
-
-        return publisher
-
-    def create_year_structure(self, year_folder_id):
-        # Initialize the year folder structure
-        year = {
-            'folder_id': year_folder_id,
-            'subfolders': {}
-        }
+    def job_status_page(self, job_id):
+        if not self.check_for_user():
+            return redirect(url_for("login"))
+        if self.job_manager.get_status(job_id, self.get_user_id()) is None:
+            return "Job not found", 404
+        return render_template('job_status.html', job_id=job_id)
+
+    def job_status(self, job_id):
+        if not self.check_for_user():
+            return jsonify({"error": "Not signed in"}), 401
+        status = self.job_manager.get_status(job_id, self.get_user_id())
+        if status is None:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify(status)
 
-        # Retrieve the contents of the year folder
-        year_contents = self.get_folder_contents(year_folder_id)
-
-        # Process each item in the year folder (e.g., months)
-        for item in year_contents:
-            if "folder" in item:
-                # If the item is a folder, create a month structure
-                folder_id = item['id']
-                folder_name = item['name']
-                month = folder_name
-                year['subfolders'][month] = {
-                    'folder_id': folder_id
-                }
-
-        return year
+    def create_comic_folder_structure(self, root_folder_id):
+        from app.folder_tree_manager import FolderTreeManager
+        tree_manager = FolderTreeManager(self.get_access_token())
+        root = tree_manager.build_folder_structure(root_folder_id)
+        return self.cdc.drive_data.set_folder_data(root)
     
-    def get_folder_contents(self, folder_id):
-        api_endpoint = f'https://graph.microsoft.com/v1.0/me/drive/items/{folder_id}/children'
+    def load_comic_folder_structure(self, root_folder_id, force_rebuild=False):
+        from app.folder_tree_manager import FolderTreeManager
+        # Cached per user and root folder; only a full rebuild walks the whole tree
+        tree_manager = FolderTreeManager(self.get_access_token())
+        root = tree_manager.load_folder_structure(root_folder_id, self.get_user_id(), force_rebuild=force_rebuild)
+        return self.cdc.drive_data.set_folder_data(root)
 
-        try:
-            response = requests.get(api_endpoint, headers={'Authorization': 'Bearer ' + session.get("access_token")})
-            if response.status_code == 200:
-                folder_contents = response.json()['value']
-                return folder_contents
-            else:
-                raise Exception(f'Error fetching folder contents. Status code: {response.status_code}\n{response}')
-        except Exception as e:
-            # Handle exceptions and errors
-            print(f'Error: {str(e)}')
-            return None
\ No newline at end of file
+    def get_folder_contents(self, folder_id):
+        from app.folder_tree_manager import FolderTreeManager
+        return FolderTreeManager(self.get_access_token()).get_folder_contents(folder_id)
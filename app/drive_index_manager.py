@@ -0,0 +1,195 @@
+import logging
+import re
+import threading
+import time
+from urllib.parse import quote
+import requests
+from app.graph_client import GraphClient
+import app_config
+import storage
+
+logger = logging.getLogger(__name__)
+
+
+# Local SQLite copy of drive item metadata, kept current with Graph delta queries
+class DriveIndexManager:
+
+    DATABASE = getattr(app_config, "DRIVE_INDEX_DATABASE", "drive_index.sqlite3")
+    ROOT_PATH = getattr(app_config, "DRIVE_INDEX_ROOT_PATH", None)
+    SYNC_INTERVAL = getattr(app_config, "DRIVE_INDEX_SYNC_SECONDS", 60)
+    # A build job still marked running after this long is assumed lost with its worker
+    BUILD_JOB_TIMEOUT = 60 * 60
+    DELTA_SELECT = "$select=id,name,parentReference,size,eTag,folder,file,deleted"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS items (
+            user_id TEXT NOT NULL,
+            id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            parent_id TEXT,
+            size INTEGER,
+            etag TEXT,
+            is_folder INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, id)
+        );
+        CREATE INDEX IF NOT EXISTS items_parent ON items (user_id, parent_id);
+        CREATE TABLE IF NOT EXISTS sync_state (
+            user_id TEXT PRIMARY KEY,
+            root_path TEXT,
+            delta_link TEXT,
+            synced_at REAL
+        );
+        CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+            name, content='items', content_rowid='rowid', tokenize='unicode61'
+        );
+        CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+            INSERT INTO items_fts (rowid, name) VALUES (new.rowid, new.name);
+        END;
+        CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
+            INSERT INTO items_fts (items_fts, rowid, name) VALUES ('delete', old.rowid, old.name);
+        END;
+        CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE OF name ON items BEGIN
+            INSERT INTO items_fts (items_fts, rowid, name) VALUES ('delete', old.rowid, old.name);
+            INSERT INTO items_fts (rowid, name) VALUES (new.rowid, new.name);
+        END;
+    """
+
+    _local = threading.local()
+    _sync_locks = {}
+    _sync_locks_lock = threading.Lock()
+
+    def __init__(self, access_token, user_id, graph_url=None):
+        self.client = GraphClient(access_token, graph_url)
+        self.user_id = user_id
+
+    @staticmethod
+    def get_connection():
+        return storage.get_thread_connection(DriveIndexManager._local, DriveIndexManager.DATABASE, DriveIndexManager.SCHEMA)
+
+    @staticmethod
+    def get_sync_lock(user_id):
+        with DriveIndexManager._sync_locks_lock:
+            return DriveIndexManager._sync_locks.setdefault(user_id, threading.Lock())
+
+    def is_ready(self):
+        # True once a full pass over the drive has finished; until then searches have to go to Graph
+        state = self._get_sync_state()
+        return bool(state and state[0] == DriveIndexManager.ROOT_PATH and state[2])
+
+    def search(self, search_term, max_age=None):
+        # Returns items shaped like Graph search results so existing parsers work unchanged, or None when the
+        # index is not built yet or cannot sync; only an incremental sync ever runs here, never a full pass
+        if not self.is_ready() or not self.sync(max_age=max_age, rebuild=False):
+            return None
+
+        match = self._build_match_query(search_term)
+        if not match:
+            return []
+        # CROSS JOIN keeps the full-text match as the outer loop instead of scanning every item
+        rows = self.get_connection().execute("""
+            SELECT i.id, i.name, i.parent_id, p.name, i.size, i.etag
+            FROM items_fts
+            CROSS JOIN items i ON i.rowid = items_fts.rowid
+            LEFT JOIN items p ON p.user_id = i.user_id AND p.id = i.parent_id
+            WHERE items_fts MATCH ? AND i.user_id = ? AND i.is_folder = 0
+        """, (match, self.user_id)).fetchall()
+
+        return [{
+            "id": item_id,
+            "name": name,
+            "parentReference": {"id": parent_id, "name": parent_name},
+            "size": size,
+            "eTag": etag
+        } for item_id, name, parent_id, parent_name, size, etag in rows]
+
+    def sync(self, max_age=None, force_rebuild=False, rebuild=True, progress=None):
+        # Applies pending delta pages; a missing or expired delta link starts over from the root unless rebuild is False
+        max_age = DriveIndexManager.SYNC_INTERVAL if max_age is None else max_age
+        with DriveIndexManager.get_sync_lock(self.user_id):
+            state = self._get_sync_state()
+            if state and not force_rebuild and state[0] == DriveIndexManager.ROOT_PATH and state[2] and time.time() - state[2] < max_age:
+                return True
+
+            delta_link = None if force_rebuild or not state or state[0] != DriveIndexManager.ROOT_PATH else state[1]
+            if delta_link is None:
+                if not rebuild:
+                    return False
+                self._clear()
+            result = self._apply_delta(delta_link or self._get_initial_delta_url(), state[2] if delta_link else 0, progress)
+            if result is None and delta_link is not None:
+                logger.info("Drive index delta expired, rebuilding")
+                self._clear()
+                if not rebuild:
+                    return False
+                result = self._apply_delta(self._get_initial_delta_url(), 0, progress)
+            return result is not None
+
+    def _get_initial_delta_url(self):
+        if DriveIndexManager.ROOT_PATH:
+            return f"/me/drive/root:/{quote(DriveIndexManager.ROOT_PATH.strip('/'))}:/delta?{DriveIndexManager.DELTA_SELECT}"
+        return f"/me/drive/root/delta?{DriveIndexManager.DELTA_SELECT}"
+
+    def _apply_delta(self, url, synced_at=0, progress=None):
+        # Each page is committed with the link that follows it, so an interrupted sync resumes where it stopped.
+        # synced_at only moves once the final page is in; it stays 0 until the first full pass completes
+        connection = self.get_connection()
+        while url:
+            try:
+                response = self.client.get(url)
+                if response.status_code == 410:
+                    return None
+                response.raise_for_status()
+                data = response.json()
+            except (requests.exceptions.RequestException, ValueError) as e:
+                logger.error(f"Error syncing drive index: {e}")
+                return None
+
+            deleted = []
+            changed = []
+            for item in data.get("value", []):
+                if "deleted" in item:
+                    deleted.append((self.user_id, item["id"]))
+                elif "name" in item:
+                    changed.append((
+                        self.user_id, item["id"], item["name"],
+                        item.get("parentReference", {}).get("id"),
+                        item.get("size"), item.get("eTag"),
+                        1 if "folder" in item else 0
+                    ))
+
+            next_link = data.get("@odata.nextLink")
+            delta_link = data.get("@odata.deltaLink")
+            with connection:
+                connection.executemany("DELETE FROM items WHERE user_id = ? AND id = ?", deleted)
+                connection.executemany("""
+                    INSERT INTO items (user_id, id, name, parent_id, size, etag, is_folder) VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (user_id, id) DO UPDATE SET
+                        name = excluded.name, parent_id = excluded.parent_id,
+                        size = excluded.size, etag = excluded.etag, is_folder = excluded.is_folder
+                """, changed)
+                connection.execute(
+                    "INSERT OR REPLACE INTO sync_state (user_id, root_path, delta_link, synced_at) VALUES (?, ?, ?, ?)",
+                    (self.user_id, DriveIndexManager.ROOT_PATH, delta_link or next_link, time.time() if delta_link else synced_at)
+                )
+            if progress:
+                progress.advance(done=len(changed) + len(deleted))
+            url = next_link
+
+        return True
+
+    def _get_sync_state(self):
+        return self.get_connection().execute(
+            "SELECT root_path, delta_link, synced_at FROM sync_state WHERE user_id = ?", (self.user_id,)
+        ).fetchone()
+
+    def _clear(self):
+        connection = self.get_connection()
+        with connection:
+            connection.execute("DELETE FROM items WHERE user_id = ?", (self.user_id,))
+            connection.execute("DELETE FROM sync_state WHERE user_id = ?", (self.user_id,))
+
+    @staticmethod
+    def _build_match_query(search_term):
+        # Every word of the search term has to prefix-match a word of the file name, like OneDrive search
+        words = re.findall(r"\w+", search_term or "")
+        return " AND ".join('"%s"*' % word for word in words)
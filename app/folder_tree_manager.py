@@ -0,0 +1,194 @@
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from app.graph_client import GraphClient
+import app_config
+import storage
+
+logger = logging.getLogger(__name__)
+
+
+class FolderTreeManager:
+
+    # Monthly Packages / publisher / year / month
+    TREE_DEPTH = 3
+    CACHEROOT = getattr(app_config, "FOLDER_CACHE_ROOT", "FolderCache")
+
+    _warned_no_delta = False
+
+    def __init__(self, access_token, graph_url=None, max_workers=None):
+        self.client = GraphClient(access_token, graph_url)
+        self.max_workers = max_workers or getattr(app_config, "GRAPH_MAX_WORKERS", 8)
+
+    def build_folder_structure(self, root_folder_id):
+        # Breadth-first: every folder on one level is listed concurrently before moving down
+        root = {
+            'folder_id': root_folder_id,
+            'subfolders': {}
+        }
+        level = [root]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for depth in range(1, FolderTreeManager.TREE_DEPTH + 1):
+                level_contents = executor.map(lambda node: self.get_child_folders(node['folder_id']), level)
+                next_level = []
+                for node, children in zip(level, level_contents):
+                    for child in children:
+                        child_node = {'folder_id': child['id']}
+                        # Month folders are leaves and carry no 'subfolders' key
+                        if depth < FolderTreeManager.TREE_DEPTH:
+                            child_node['subfolders'] = {}
+                            next_level.append(child_node)
+                        node['subfolders'][child['name']] = child_node
+                level = next_level
+                if not level:
+                    break
+
+        return root
+
+    def get_child_folders(self, folder_id):
+        return [item for item in self.get_folder_contents(folder_id) if "folder" in item]
+
+    def get_folder_contents(self, folder_id):
+        # Errors are raised rather than returning a partial list, which would be cached as if the missing folders did not exist
+        folder_contents = []
+        for page in self.client.prefetch_pages(f"/me/drive/items/{folder_id}/children?$select=id,name,folder"):
+            folder_contents.extend(page['value'])
+
+        return folder_contents
+
+    def load_folder_structure(self, root_folder_id, user_id, force_rebuild=False):
+        # Serve the tree from the on-disk cache, bringing it up to date with a single delta call
+        cache_path = self._get_cache_path(root_folder_id, user_id)
+        cache = None if force_rebuild else self._read_cache(cache_path)
+
+        if cache is not None:
+            cache = self._apply_delta(cache)
+        if cache is None:
+            try:
+                cache = self._rebuild_cache(root_folder_id)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                # Nothing is written, so the next load retries the crawl instead of serving an incomplete tree
+                logger.error(f"Error rebuilding folder cache for {root_folder_id}: {e}")
+                raise
+
+        self._write_cache(cache_path, cache)
+        return self._build_tree_from_folders(root_folder_id, cache["folders"])
+
+    def _rebuild_cache(self, root_folder_id):
+        # Take the delta token before crawling so changes made during the crawl are replayed next time
+        delta_scope, delta_link = self._get_latest_delta_link(root_folder_id)
+        root = self.build_folder_structure(root_folder_id)
+        return {
+            "root_folder_id": root_folder_id,
+            "delta_scope": delta_scope,
+            "delta_link": delta_link,
+            "folders": self._flatten_tree(root)
+        }
+
+    def _get_latest_delta_link(self, root_folder_id):
+        # OneDrive for Business and SharePoint only support delta on the drive root, so fall back to it
+        # and keep only the changes under our tree; returns (scope, link) with link None when neither works
+        for delta_scope, url in (("folder", f"/me/drive/items/{root_folder_id}/delta"), ("drive", "/me/drive/root/delta")):
+            try:
+                return delta_scope, self.client.get_json(url + "?token=latest&$select=id,name,folder,parentReference,deleted")["@odata.deltaLink"]
+            except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+                logger.info(f"{delta_scope.capitalize()} delta is not available for {root_folder_id}: {e}")
+        return None, None
+
+    def _apply_delta(self, cache):
+        # Returns None when the cache cannot be brought up to date and has to be rebuilt
+        url = cache.get("delta_link")
+        if not url and "delta_scope" not in cache:
+            return None
+        if not url:
+            # Without any delta support a fresh crawl on every load would make the cache useless
+            if not FolderTreeManager._warned_no_delta:
+                logger.warning("Delta queries are not available; serving the cached folder tree until it is rebuilt")
+                FolderTreeManager._warned_no_delta = True
+            return cache
+
+        folders = cache["folders"]
+        drive_scope = cache.get("delta_scope") == "drive"
+        while url:
+            try:
+                response = self.client.get(url)
+                if response.status_code == 410:
+                    logger.info("Delta token expired, rebuilding folder cache")
+                    return None
+                response.raise_for_status()
+                data = response.json()
+            except (requests.exceptions.RequestException, ValueError) as e:
+                logger.error(f"Error applying folder delta: {e}")
+                return None
+
+            for item in data.get("value", []):
+                if item["id"] == cache["root_folder_id"]:
+                    continue
+                parent_id = item.get("parentReference", {}).get("id")
+                if "deleted" in item:
+                    folders.pop(item["id"], None)
+                elif "folder" not in item:
+                    continue
+                elif not drive_scope or parent_id == cache["root_folder_id"] or parent_id in folders:
+                    folders[item["id"]] = {"name": item["name"], "parent_id": parent_id}
+                else:
+                    # A drive-wide delta reports every folder; one moved out of our tree is dropped
+                    folders.pop(item["id"], None)
+
+            cache["delta_link"] = data.get("@odata.deltaLink", cache["delta_link"])
+            url = data.get("@odata.nextLink")
+
+        return cache
+
+    def _flatten_tree(self, root):
+        folders = {}
+        pending = [root]
+        while pending:
+            node = pending.pop()
+            for name, child in node.get('subfolders', {}).items():
+                folders[child['folder_id']] = {"name": name, "parent_id": node['folder_id']}
+                pending.append(child)
+        return folders
+
+    def _build_tree_from_folders(self, root_folder_id, folders):
+        children = {}
+        for folder_id, folder in folders.items():
+            children.setdefault(folder["parent_id"], []).append((folder_id, folder["name"]))
+
+        root = {
+            'folder_id': root_folder_id,
+            'subfolders': {}
+        }
+        level = [root]
+        for depth in range(1, FolderTreeManager.TREE_DEPTH + 1):
+            next_level = []
+            for node in level:
+                for folder_id, name in children.get(node['folder_id'], []):
+                    child_node = {'folder_id': folder_id}
+                    if depth < FolderTreeManager.TREE_DEPTH:
+                        child_node['subfolders'] = {}
+                        next_level.append(child_node)
+                    node['subfolders'][name] = child_node
+            level = next_level
+
+        return root
+
+    def _get_cache_path(self, root_folder_id, user_id):
+        return os.path.join(FolderTreeManager.CACHEROOT, f"{storage.safe_key(user_id, root_folder_id)}.json")
+
+    def _read_cache(self, cache_path):
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with open(cache_path, "r", encoding="utf-8") as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading folder cache {cache_path}: {e}")
+            return None
+
+    def _write_cache(self, cache_path, cache):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        storage.write_atomic(cache_path, lambda cache_file: json.dump(cache, cache_file))
@@ -0,0 +1,225 @@
+import contextvars
+import queue
+import random
+import re
+import threading
+import time
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+import app_config
+import instrumentation
+
+GRAPH_URL = getattr(app_config, "GRAPH_URL", "https://graph.microsoft.com/v1.0")
+
+
+# Token bucket shared by every Graph call in the process; throttling halves the rate, successes win it back
+class AdaptiveRateLimiter:
+
+    def __init__(self, rate, max_rate, min_rate=1.0, throttle_window=1.0):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.throttle_window = throttle_window
+        self.tokens = rate
+        self.blocked_until = 0.0
+        self.window_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.blocked_until > now:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def on_throttle(self, retry_after):
+        # Requests already in flight when the first 429 arrives come back throttled too, so the rate is halved
+        # once per window; a throttle after the window means the lower rate is still too high
+        with self._lock:
+            now = time.monotonic()
+            if now >= self.window_until:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.window_until = now + max(retry_after, self.throttle_window)
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + 0.1)
+
+
+class GraphClient:
+
+    IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+    THROTTLE_STATUSES = {429, 503}
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    POOL_SIZE = getattr(app_config, "GRAPH_POOL_SIZE", 32)
+    PREFETCH_DEPTH = getattr(app_config, "GRAPH_PREFETCH_PAGES", 2)
+
+    # Shared by every client in the process so connections are kept alive across requests and users
+    _session = None
+    _session_lock = threading.Lock()
+    rate_limiter = AdaptiveRateLimiter(
+        rate=getattr(app_config, "GRAPH_REQUESTS_PER_SECOND", 20.0),
+        max_rate=getattr(app_config, "GRAPH_REQUESTS_PER_SECOND", 20.0)
+    )
+
+    def __init__(self, access_token, graph_url=None, timeout=60, max_retries=4, backoff=0.5):
+        # access_token is either a token string or a callable(force_refresh=False) returning one
+        self.access_token = access_token
+        self.graph_url = (graph_url or GRAPH_URL).rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.session = GraphClient.get_session()
+
+    @staticmethod
+    def get_session():
+        with GraphClient._session_lock:
+            if GraphClient._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=GraphClient.POOL_SIZE, pool_maxsize=GraphClient.POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                GraphClient._session = session
+            return GraphClient._session
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def request(self, method, url, idempotent=None, **kwargs):
+        # Throttled and failed calls are retried only when repeating them is safe
+        if idempotent is None:
+            idempotent = method in GraphClient.IDEMPOTENT_METHODS
+        url = url if url.startswith("http") else self.graph_url + url
+        headers = dict(kwargs.pop("headers", {}))
+        kwargs.setdefault("timeout", self.timeout)
+        endpoint = GraphClient.get_endpoint_name(method, url)
+
+        attempt = 0
+        force_refresh = False
+        while True:
+            attempt += 1
+            headers["Authorization"] = "Bearer " + self.get_access_token(force_refresh)
+            GraphClient.rate_limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, headers=headers, **kwargs)
+            except requests.exceptions.RequestException:
+                instrumentation.observe("graph_request_seconds", time.perf_counter() - start, endpoint=endpoint, status="error")
+                if not idempotent or attempt > self.max_retries:
+                    raise
+                time.sleep(self._get_retry_delay(attempt, None))
+                continue
+
+            instrumentation.observe("graph_request_seconds", time.perf_counter() - start, endpoint=endpoint, status=str(response.status_code))
+
+            # A token provider gets one chance to refresh an access token the server rejected
+            if response.status_code == 401 and callable(self.access_token) and not force_refresh:
+                force_refresh = True
+                continue
+            retry_after = self._get_retry_after(response)
+            if response.status_code in GraphClient.THROTTLE_STATUSES:
+                instrumentation.count("graph_throttled_total", endpoint=endpoint)
+                GraphClient.rate_limiter.on_throttle(retry_after or self._get_retry_delay(attempt, None))
+            elif response.status_code < 400:
+                GraphClient.rate_limiter.on_success()
+
+            # A throttled request was never processed, so it is safe to repeat whatever the method
+            retryable = response.status_code in GraphClient.THROTTLE_STATUSES or (idempotent and response.status_code in GraphClient.RETRY_STATUSES)
+            if not retryable or attempt > self.max_retries:
+                return response
+            time.sleep(self._get_retry_delay(attempt, retry_after))
+
+    def get_access_token(self, force_refresh=False):
+        if callable(self.access_token):
+            return self.access_token(force_refresh=force_refresh) or ""
+        return self.access_token
+
+    def get_json(self, url, **kwargs):
+        response = self.get(url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def iter_pages(self, url, **kwargs):
+        # Yields each page's JSON, following @odata.nextLink until the last page
+        while url:
+            data = self.get_json(url, **kwargs)
+            yield data
+            url = data.get("@odata.nextLink")
+
+    def prefetch_pages(self, url, depth=None, **kwargs):
+        # Same pages as iter_pages, but page N+1 is requested on a background thread while the caller works on page N
+        depth = depth or GraphClient.PREFETCH_DEPTH
+        pages = queue.Queue(maxsize=depth)
+        stop = threading.Event()
+
+        def put(item):
+            # A bounded queue keeps the fetcher at most `depth` pages ahead; stop is checked so an abandoned pager exits
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def fetch():
+            try:
+                for data in self.iter_pages(url, **kwargs):
+                    if not put(("page", data)):
+                        return
+                put(("done", None))
+            except Exception as e:
+                put(("error", e))
+
+        # The fetcher runs in a copy of the caller's context so its calls keep the caller's trace ID
+        fetcher = threading.Thread(target=contextvars.copy_context().run, args=(fetch,), daemon=True)
+        fetcher.start()
+        try:
+            while True:
+                kind, item = pages.get()
+                if kind == "done":
+                    return
+                if kind == "error":
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+    def _get_retry_delay(self, attempt, retry_after):
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, self.backoff * (2 ** (attempt - 1)))
+
+    @staticmethod
+    def _get_retry_after(response):
+        value = response.headers.get("Retry-After")
+        if value and value.isdigit():
+            return float(value)
+        return None
+
+    @staticmethod
+    def get_endpoint_name(method, url):
+        # Collapses IDs and search terms so counters group calls by endpoint, not by item
+        path = urlparse(url).path
+        path = re.sub(r"^/(v1\.0|beta)", "", path)
+        path = re.sub(r"(/items/)[^/:]+", r"\1{id}", path)
+        path = re.sub(r":/.*?(:|$)", r":/{path}\1", path)
+        path = re.sub(r"search\(q='.*'\)", "search(q={q})", path)
+        return f"{method} {path}"
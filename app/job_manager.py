@@ -0,0 +1,114 @@
+import contextvars
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import app_config
+import instrumentation
+import storage
+
+logger = logging.getLogger(__name__)
+
+
+# Handed to a running job so it can report how many items it has processed
+class JobProgress:
+
+    def __init__(self, job_manager, job_id):
+        self.job_manager = job_manager
+        self.job_id = job_id
+
+    def add_total(self, count):
+        self.job_manager._update(self.job_id, "total = total + ?", (count,))
+
+    def advance(self, done=0, failed=0):
+        self.job_manager._update(self.job_id, "done = done + ?, failed = failed + ?", (done, failed))
+
+
+class JobManager:
+
+    DATABASE = getattr(app_config, "JOB_DATABASE", "jobs.sqlite3")
+    WORKERS = getattr(app_config, "JOB_WORKERS", 2)
+
+    def __init__(self):
+        self._local = threading.local()
+        self.executor = ThreadPoolExecutor(max_workers=JobManager.WORKERS)
+        self._get_connection().executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                user_id TEXT,
+                status TEXT NOT NULL,
+                total INTEGER NOT NULL DEFAULT 0,
+                done INTEGER NOT NULL DEFAULT 0,
+                failed INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                error TEXT,
+                result TEXT
+            );
+            CREATE INDEX IF NOT EXISTS jobs_user ON jobs (user_id, created_at);
+        """)
+
+    def _get_connection(self):
+        # Status polls may land on any worker thread, so each thread keeps its own connection
+        return storage.get_thread_connection(self._local, JobManager.DATABASE, row_factory=sqlite3.Row)
+
+    def _update(self, job_id, assignments, params=()):
+        connection = self._get_connection()
+        with connection:
+            connection.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*params, job_id))
+
+    def submit(self, kind, user_id, func, *args):
+        # func(progress, *args) runs on a worker thread; its return value is stored as the job result
+        job_id = uuid.uuid4().hex
+        connection = self._get_connection()
+        with connection:
+            connection.execute(
+                "INSERT INTO jobs (id, kind, user_id, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, kind, user_id, time.time())
+            )
+        # Jobs run in a copy of the submitting request's context, so their logs carry its trace ID
+        self.executor.submit(contextvars.copy_context().run, self._run, job_id, func, args)
+        return job_id
+
+    def _run(self, job_id, func, args):
+        instrumentation.start_trace(instrumentation.get_trace_id())
+        kind = self._get_connection().execute("SELECT kind FROM jobs WHERE id = ?", (job_id,)).fetchone()["kind"]
+        self._update(job_id, "status = 'running', started_at = ?", (time.time(),))
+        try:
+            with instrumentation.timer("job_seconds", kind=kind):
+                result = func(JobProgress(self, job_id), *args)
+            self._update(job_id, "status = 'done', finished_at = ?, result = ?", (time.time(), json.dumps(result)))
+            instrumentation.count("jobs_total", kind=kind, status="done")
+        except Exception as e:
+            logger.exception(f"Job {job_id} failed")
+            self._update(job_id, "status = 'failed', finished_at = ?, error = ?", (time.time(), str(e)))
+            instrumentation.count("jobs_total", kind=kind, status="failed")
+
+    def get_active_job(self, kind, user_id, max_age=None):
+        # The newest queued or running job of this kind for the user, in any worker process
+        created_after = time.time() - max_age if max_age else 0
+        row = self._get_connection().execute(
+            "SELECT id FROM jobs WHERE kind = ? AND user_id = ? AND status IN ('queued', 'running') AND created_at > ? ORDER BY created_at DESC LIMIT 1",
+            (kind, user_id, created_after)
+        ).fetchone()
+        return row["id"] if row else None
+
+    def get_status(self, job_id, user_id=None):
+        row = self._get_connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None or (user_id is not None and row["user_id"] != user_id):
+            return None
+
+        status = dict(row)
+        status["result"] = json.loads(row["result"]) if row["result"] else None
+        processed = row["done"] + row["failed"]
+        elapsed = ((row["finished_at"] or time.time()) - row["started_at"]) if row["started_at"] else 0.0
+        status["elapsed_seconds"] = elapsed
+        status["throughput"] = processed / elapsed if elapsed > 0 else 0.0
+        remaining = max(row["total"] - processed, 0)
+        status["eta_seconds"] = remaining / status["throughput"] if status["throughput"] > 0 and row["status"] == "running" else None
+        return status
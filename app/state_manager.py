@@ -0,0 +1,61 @@
+import logging
+import os
+import pickle
+import time
+import uuid
+from flask import session
+import app_config
+import storage
+
+logger = logging.getLogger(__name__)
+
+
+class StateManager:
+
+    STATEROOT = getattr(app_config, "WORKFLOW_STATE_ROOT", "WorkflowState")
+    MAX_AGE = getattr(app_config, "WORKFLOW_STATE_MAX_AGE_DAYS", 7) * 24 * 60 * 60
+
+    def __init__(self):
+        os.makedirs(StateManager.STATEROOT, exist_ok=True)
+        self.prune_expired_states()
+
+    def load_corrector(self):
+        # tool_suite brings in pandas, so it is only imported once a tool route needs a corrector
+        from tool_suite import CoverDateCorrector
+        state_path = self._get_state_path()
+        if state_path and os.path.exists(state_path):
+            try:
+                with open(state_path, "rb") as state_file:
+                    return CoverDateCorrector.from_state(pickle.load(state_file))
+            except (OSError, pickle.UnpicklingError, EOFError, KeyError) as e:
+                logger.warning(f"Discarding unreadable workflow state {state_path}: {e}")
+        return CoverDateCorrector()
+
+    def save_corrector(self, cdc):
+        if "workflow_id" not in session:
+            session["workflow_id"] = uuid.uuid4().hex
+        state_path = self._get_state_path()
+
+        # Concurrent workers never read a partial state
+        storage.write_atomic(state_path, lambda state_file: pickle.dump(cdc.get_state(), state_file, protocol=pickle.HIGHEST_PROTOCOL), binary=True)
+
+    def clear_corrector(self):
+        state_path = self._get_state_path()
+        if state_path and os.path.exists(state_path):
+            os.remove(state_path)
+
+    def prune_expired_states(self):
+        cutoff = time.time() - StateManager.MAX_AGE
+        for filename in os.listdir(StateManager.STATEROOT):
+            path = os.path.join(StateManager.STATEROOT, filename)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def _get_state_path(self):
+        workflow_id = session.get("workflow_id")
+        if workflow_id is None:
+            return None
+        return os.path.join(StateManager.STATEROOT, f"{workflow_id}.pkl")
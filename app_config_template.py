@@ -3,4 +3,29 @@ CLIENT_SECRET = "" #YOUR CLIENT SECRET HERE
 AUTHORITY = "https://login.microsoftonline.com/common" #CHANGE BASED ON YOUR NEEDS
 REDIRECT_PATH = "/get_token" #CHANGE BASED ON YOUR NEEDS
 SCOPE = ["Files.ReadWrite.All"] #CHANGE BASED ON YOUR NEEDS
-SESSION_TYPE = "filesystem"
\ No newline at end of file
+SESSION_TYPE = "filesystem"
+GRAPH_URL = "https://graph.microsoft.com/v1.0" #POINT AT A LOCAL STUB SERVER FOR TESTING
+GRAPH_MAX_WORKERS = 8 #CONCURRENT GRAPH REQUESTS PER OPERATION
+FOLDER_CACHE_ROOT = "FolderCache" #LOCAL CACHE OF THE MONTHLY PACKAGES FOLDER TREE
+MAW_CACHE_TTL_DAYS = 30 #DAYS BEFORE CACHED MAW DATA IS CONSIDERED STALE
+MAW_CACHE_SERIES_TTL_DAYS = {} #PER SERIES OVERRIDES, E.G. {"1234": 7} FOR ONGOING SERIES
+MAW_CACHE_STALE_WHILE_REVALIDATE = True #SERVE STALE DATA WHILE REFRESHING IN THE BACKGROUND
+MAW_CACHE_MEMORY_SIZE = 64 #SERIES KEPT IN MEMORY
+WORKFLOW_STATE_ROOT = "WorkflowState" #PER SESSION COVER DATE CORRECTOR STATE
+WORKFLOW_STATE_MAX_AGE_DAYS = 7 #ABANDONED WORKFLOW STATE IS REMOVED AFTER THIS MANY DAYS
+JOB_DATABASE = "jobs.sqlite3" #BACKGROUND JOB TABLE
+JOB_WORKERS = 2 #BACKGROUND JOBS RUN AT THE SAME TIME PER PROCESS
+GRAPH_POOL_SIZE = 32 #KEEP-ALIVE CONNECTIONS SHARED BY ALL GRAPH CALLS
+GRAPH_REQUESTS_PER_SECOND = 20.0 #STARTING AND MAXIMUM GRAPH REQUEST RATE, LOWERED AUTOMATICALLY WHEN THROTTLED
+TOKEN_CACHE_ROOT = "TokenCache" #PRIVATE (0700) DIRECTORY FOR THE MSAL TOKEN CACHE SHARED BY ALL WORKERS, KEEP IT OUT OF BACKUPS AND THE WEB ROOT
+TOKEN_REFRESH_MARGIN_SECONDS = 600 #REFRESH ACCESS TOKENS THIS LONG BEFORE THEY EXPIRE
+DRIVE_INDEX_ENABLED = True #ANSWER DRIVE SEARCHES FROM A LOCAL INDEX KEPT IN SYNC WITH DELTA QUERIES
+DRIVE_INDEX_DATABASE = "drive_index.sqlite3" #LOCAL DRIVE INDEX
+DRIVE_INDEX_ROOT_PATH = None #ONLY INDEX THIS DRIVE FOLDER, E.G. "Comics"; NONE INDEXES THE WHOLE DRIVE
+DRIVE_INDEX_SYNC_SECONDS = 60 #SEARCHES WITHIN THIS MANY SECONDS OF THE LAST SYNC SKIP THE DELTA CALL
+GRAPH_PREFETCH_PAGES = 2 #PAGES OF A PAGED GRAPH LISTING FETCHED AHEAD OF THE ONE BEING PROCESSED
+INSTRUMENTATION_ENABLED = True #TIMERS AND COUNTERS; FALSE TURNS THEM INTO NO-OPS
+METRICS_ENDPOINT_ENABLED = True #PROMETHEUS METRICS AT /metrics, RESTRICT ACCESS AT YOUR PROXY
+SERVER_TIMING_HEADER = False #ADD A PER REQUEST TIMING BREAKDOWN IN THE Server-Timing RESPONSE HEADER
+LOG_LEVEL = "INFO"
+WARM_UP_ON_START = False #IMPORT THE TOOL ROUTES AT STARTUP, E.G. WITH GUNICORN --preload; FALSE LOADS THEM ON FIRST USE
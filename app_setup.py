@@ -3,15 +3,20 @@ from flask_session import Session
 from app.comic_manager import ComicBookManagerApp 
 from app.auth_manager import AuthManager
 import app_config
+import instrumentation
 
 def create_app():
+    instrumentation.configure_logging()
     app = Flask(__name__)
     app.config.from_object(app_config)
     Session(app)
+    instrumentation.init_app(app)
     manager = ComicBookManagerApp(app)
     auth_manager = AuthManager(app)
 
     auth_manager.register_auth_routes()
     manager.register_routes()
+    if getattr(app_config, "WARM_UP_ON_START", False):
+        manager.warm_up()
 
     return app
\ No newline at end of file
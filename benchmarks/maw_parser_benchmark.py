@@ -0,0 +1,86 @@
+import argparse
+import json
+import os
+import re
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+from MAW_Fetch import MAWFetcher
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "maw_series_page.html")
+CHUNK_SIZE = 16384
+
+
+def load_fixture(issue_count):
+    # Repeats the fixture's issue rows until the page lists roughly issue_count issues
+    with open(FIXTURE, "r", encoding="utf-8") as fixture_file:
+        page = fixture_file.read()
+    rows = re.findall(r"\s*<tr class=\"(?:odd|even)\">.*?</tr>", page, flags=re.DOTALL)
+    repeats = max(1, -(-issue_count // len(rows)))
+    page = page.replace("".join(rows), "".join(rows) * repeats)
+    return page.encode("utf-8")
+
+
+def legacy_parse(content):
+    # The BeautifulSoup implementation MAWFetcher.fetch used before streaming
+    issues = []
+    cover_dates = []
+    soup = BeautifulSoup(content, "html.parser")
+    for row in soup.find_all("tr"):
+        columns = row.find_all("td")
+        if len(columns) >= 2:
+            issues.append(columns[0].text.strip())
+            cover_dates.append(columns[1].text.strip())
+    return issues, cover_dates
+
+
+def streaming_parse(content):
+    chunks = (content[i:i + CHUNK_SIZE] for i in range(0, len(content), CHUNK_SIZE))
+    issues = []
+    cover_dates = []
+    for issue, cover_date in MAWFetcher.parse_stream(chunks, "utf-8"):
+        issues.append(issue)
+        cover_dates.append(cover_date)
+    return issues, cover_dates
+
+
+def measure(parse, content, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        issues, _ = parse(content)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    parse(content)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "rows": len(issues),
+        "best_seconds": min(timings),
+        "median_seconds": sorted(timings)[len(timings) // 2],
+        "peak_bytes": peak
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the legacy and streaming MAW series page parsers")
+    parser.add_argument("--issues", type=int, nargs="+", default=[50, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+    for issue_count in args.issues:
+        content = load_fixture(issue_count)
+        results.append({
+            "issues": issue_count,
+            "page_bytes": len(content),
+            "legacy": measure(legacy_parse, content, args.repeat),
+            "streaming": measure(streaming_parse, content, args.repeat)
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
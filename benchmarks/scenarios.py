@@ -0,0 +1,190 @@
+import argparse
+import json
+import math
+import platform
+import subprocess
+import time
+import tracemalloc
+from app.batch_manager import BatchManager
+from app.folder_tree_manager import FolderTreeManager
+from app.graph_client import GraphClient, AdaptiveRateLimiter
+from benchmarks.stubs import GraphStub, MAWStub
+from benchmarks.synthetic import make_series, make_maw_frame, make_folder_tree, make_drive_items
+from MAW_Fetch import MAWFetcher
+from tool_suite import CoverDateCorrector, DriveDataManager, FilterManager
+
+TOKEN = "benchmark-token"
+
+
+# Each scenario sets up one size and returns (run, teardown); run() is timed and returns the items it processed
+def maw_fetch(size, options):
+    stub = MAWStub({"1": make_series(size)}, latency=options.latency).start()
+    live_url, MAWFetcher.url = MAWFetcher.url, stub.url + "/seriesissues.php"
+
+    def run():
+        fetcher = MAWFetcher("1")
+        fetcher.fetch()
+        return len(fetcher.issues)
+
+    def teardown():
+        MAWFetcher.url = live_url
+        stub.stop()
+    return run, teardown
+
+
+def filter_maw(size, options):
+    data = make_maw_frame(make_series(size))
+
+    def run():
+        # A fresh FilterManager each time, so every term mask is computed rather than served from its cache
+        data_filter = FilterManager()
+        data_filter.add_filter("Annual")
+        data_filter.add_filter(r"#\d*7$", is_regex=True)
+        return len(data_filter.filter(data, "Issue Name"))
+    return run, None
+
+
+def extract_destination_folders(size, options):
+    cdc = CoverDateCorrector()
+    cdc.maw_data.active_data = make_maw_frame(make_series(size))
+    return lambda: len(cdc.extract_destination_folders()), None
+
+
+def create_final_data(size, options):
+    series = make_series(size)
+    cdc = CoverDateCorrector()
+    cdc.maw_data.active_data = make_maw_frame(series)
+    cdc.drive_data.parse_graph_response_to_data_frame(make_drive_items(size, series))
+    cdc.drive_data.set_folder_data(make_folder_tree(publishers=("DC",), start_year=1960, end_year=1960 + size // 12)[1])
+
+    def run():
+        plan, unresolved_data = cdc.create_move_plan("DC")
+        final_data = CoverDateCorrector.get_final_data(plan)
+        return len(final_data) + len(unresolved_data)
+    return run, None
+
+
+def folder_structure(size, options):
+    # size is the number of years per publisher; two publishers, twelve months each
+    folders, _ = make_folder_tree(start_year=2000, end_year=2000 + size - 1)
+    stub = GraphStub(folders=folders, latency=options.latency, throttle_rate=options.throttle_rate).start()
+
+    def run():
+        tree = FolderTreeManager(TOKEN, graph_url=stub.url).build_folder_structure("root0")
+        return sum(len(year["subfolders"]) for publisher in tree["subfolders"].values() for year in publisher["subfolders"].values())
+    return run, stub.stop
+
+
+def move_files(size, options):
+    items = make_drive_items(size, make_series(size))
+    stub = GraphStub(items=items, latency=options.latency, throttle_rate=options.throttle_rate).start()
+    final_data = DriveDataManager.parse_graph_page(items).rename(columns={"Parent ID": "Destination ID"})
+
+    def run():
+        results = BatchManager(TOKEN, graph_url=stub.url).move_files(final_data)
+        return int(results["Error"].isna().sum())
+    return run, stub.stop
+
+
+def search_ingest(size, options):
+    # size is the drive size; every item matches, so this measures paging plus DataFrame ingestion
+    stub = GraphStub(items=make_drive_items(size), latency=options.latency, throttle_rate=options.throttle_rate).start()
+
+    def run():
+        drive_data = DriveDataManager()
+        pages = GraphClient(TOKEN, graph_url=stub.url).prefetch_pages("/me/drive/root/search(q='cbz')?select=name,parentReference,id")
+        for _ in drive_data.ingest_graph_pages(pages):
+            pass
+        return len(drive_data.active_data)
+    return run, stub.stop
+
+
+SCENARIOS = {
+    "maw_fetch": (maw_fetch, [10, 1000, 10000]),
+    "filter": (filter_maw, [10, 1000, 10000]),
+    "extract_destination_folders": (extract_destination_folders, [10, 1000, 10000]),
+    "create_final_data": (create_final_data, [10, 1000, 10000]),
+    "folder_structure": (folder_structure, [1, 10, 60]),
+    "move_files": (move_files, [10, 1000, 10000]),
+    "search_ingest": (search_ingest, [1000, 10000, 100000])
+}
+
+
+def percentile(timings, fraction):
+    ordered = sorted(timings)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def measure(run, repeat):
+    run()  # warm-up: imports, connection pools, compiled regexes
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = run()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    p50 = percentile(timings, 0.5)
+    return {
+        "items": items,
+        "repeat": repeat,
+        "p50_seconds": p50,
+        "p99_seconds": percentile(timings, 0.99),
+        "items_per_second": items / p50 if p50 else None,
+        "peak_bytes": peak
+    }
+
+
+def get_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the hot-path benchmarks against local Graph and MAW stubs and print JSON")
+    parser.add_argument("scenarios", nargs="*", help=f"Scenarios to run (default: all): {', '.join(SCENARIOS)}")
+    parser.add_argument("--sizes", type=int, nargs="+", help="Override every scenario's default sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per size")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the stubs wait before answering")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of Graph requests answered with 429")
+    parser.add_argument("--graph-rate", type=float, default=1000.0, help="GraphClient requests per second; the stubs have no quota")
+    parser.add_argument("--output", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(unknown)}")
+
+    report = {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "options": {"repeat": args.repeat, "latency": args.latency, "throttle_rate": args.throttle_rate, "graph_rate": args.graph_rate},
+        "results": []
+    }
+    for name in args.scenarios or list(SCENARIOS):
+        scenario, default_sizes = SCENARIOS[name]
+        for size in args.sizes or default_sizes:
+            # Throttling in one scenario lowers the shared rate, so every size starts from a fresh limiter
+            GraphClient.rate_limiter = AdaptiveRateLimiter(rate=args.graph_rate, max_rate=args.graph_rate)
+            run, teardown = scenario(size, args)
+            try:
+                report["results"].append(dict(measure(run, args.repeat), scenario=name, size=size))
+            finally:
+                if teardown:
+                    teardown()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Runs in a fresh interpreter, so every import is a cold one; prints one JSON line of timings
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import app_config
+app_config.WARM_UP_ON_START = %(warm_up)r
+import app_setup
+imported = time.perf_counter()
+app = app_setup.create_app()
+created = time.perf_counter()
+client = app.test_client()
+with client.session_transaction() as flask_session:
+    flask_session["user"] = {"name": "Benchmark", "oid": "benchmark"}
+    flask_session["access_token"] = "benchmark-token"
+index_start = time.perf_counter()
+client.get("/")
+index_done = time.perf_counter()
+pandas_after_index = "pandas" in sys.modules
+modules_after_index = len(sys.modules)
+client.get("/tools/cover_date_corrector")
+tool_done = time.perf_counter()
+print(json.dumps({
+    "import_seconds": imported - start,
+    "create_app_seconds": created - imported,
+    "first_index_seconds": index_done - index_start,
+    "first_tool_seconds": tool_done - index_done,
+    "ready_seconds": created - start,
+    "modules_after_index": modules_after_index,
+    "pandas_after_index": pandas_after_index
+}))
+"""
+
+TIMINGS = ["import_seconds", "create_app_seconds", "first_index_seconds", "first_tool_seconds", "ready_seconds"]
+
+
+def run_once(repo, warm_up):
+    # The work directory keeps the session files, job table and workflow state out of the checkout
+    with tempfile.TemporaryDirectory() as work_dir:
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [repo, os.environ.get("PYTHONPATH")])))
+        completed = subprocess.run([sys.executable, "-c", CHILD % {"warm_up": warm_up}], cwd=work_dir, env=env,
+                                   capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure(repo, warm_up, repeat):
+    runs = [run_once(repo, warm_up) for _ in range(repeat)]
+    result = {name: statistics.median(run[name] for run in runs) for name in TIMINGS}
+    result["modules_after_index"] = runs[-1]["modules_after_index"]
+    result["pandas_after_index"] = runs[-1]["pandas_after_index"]
+    return result
+
+
+def get_commit(repo):
+    try:
+        return subprocess.run(["git", "-C", repo, "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time cold imports, app creation and the first requests in fresh processes and print JSON")
+    parser.add_argument("--repo", action="append", help="Checkout to measure; repeat to compare, e.g. a worktree of an older commit (default: this one)")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh processes per checkout and mode; medians are reported")
+    parser.add_argument("--output", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    repos = args.repo or [os.path.dirname(os.path.dirname(os.path.abspath(__file__)))]
+    report = {"python": platform.python_version(), "repeat": args.repeat, "results": []}
+    for repo in repos:
+        repo = os.path.abspath(repo)
+        for mode, warm_up in (("lazy", False), ("warm_up", True)):
+            report["results"].append(dict(measure(repo, warm_up, args.repeat), repo=repo, commit=get_commit(repo), mode=mode))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
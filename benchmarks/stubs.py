@@ -0,0 +1,196 @@
+import json
+import random
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, unquote
+from benchmarks.synthetic import make_maw_page
+
+
+# Serves canned responses on 127.0.0.1 with optional latency and throttling; subclasses route the requests
+class StubServer:
+
+    def __init__(self, latency=0.0, throttle_rate=0.0, retry_after=0, seed=0):
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.requests = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                stub._handle(self, "GET")
+
+            def do_POST(self):
+                stub._handle(self, "POST")
+
+            def do_PATCH(self):
+                stub._handle(self, "PATCH")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def should_throttle(self):
+        with self._lock:
+            return self.throttle_rate and self._random.random() < self.throttle_rate
+
+    def _handle(self, handler, method):
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = handler.rfile.read(length) if length else b""
+        if self.latency:
+            time.sleep(self.latency)
+        if self.should_throttle():
+            return self._send(handler, 429, b"", {"Retry-After": str(self.retry_after)})
+        status, content, headers = self.route(method, handler.path, body)
+        with self._lock:
+            key = f"{method} {status}"
+            self.requests[key] = self.requests.get(key, 0) + 1
+        self._send(handler, status, content, headers)
+
+    def _send(self, handler, status, content, headers):
+        handler.send_response(status)
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.send_header("Content-Length", str(len(content)))
+        handler.end_headers()
+        handler.wfile.write(content)
+
+    def route(self, method, path, body):
+        raise NotImplementedError
+
+
+# The slice of Microsoft Graph the app uses: search paging, children, delta, PATCH moves, folder creation and $batch
+class GraphStub(StubServer):
+
+    def __init__(self, items=None, folders=None, page_size=200, **kwargs):
+        super().__init__(**kwargs)
+        self.page_size = page_size
+        self._listings = {}
+        self.items = {item["id"]: dict(item) for item in items or []}
+        for folder_id, (name, parent_id) in (folders or {}).items():
+            self.items[folder_id] = {"id": folder_id, "name": name, "folder": {}, "parentReference": {"id": parent_id, "name": None}}
+
+    def route(self, method, path, body):
+        url = urlparse(path)
+        route = unquote(re.sub(r"^/(v1\.0|beta)", "", url.path))
+        query = parse_qs(url.query)
+
+        if method == "POST" and route == "/$batch":
+            return self._json(200, {"responses": [self._run_sub_request(sub_request) for sub_request in json.loads(body)["requests"]]})
+
+        # Later pages reuse the listing built for the first one, as a server-side cursor would
+        skip = int(query.get("$skiptoken", ["0"])[0])
+        if skip and route in self._listings:
+            status, data = 200, self._listings[route]
+        else:
+            status, data = self._run(method, route, query, json.loads(body) if body else None)
+        if isinstance(data, list):
+            self._listings[route] = data
+            page = {"value": data[skip:skip + self.page_size]}
+            if skip + self.page_size < len(data):
+                page["@odata.nextLink"] = f"{self.url}{url.path}?$skiptoken={skip + self.page_size}"
+            elif route.endswith("/delta"):
+                page["@odata.deltaLink"] = f"{self.url}{url.path}?token=latest"
+            data = page
+        return self._json(status, data)
+
+    def _run_sub_request(self, sub_request):
+        if self.should_throttle():
+            return {"id": sub_request["id"], "status": 429, "headers": {"Retry-After": str(self.retry_after)}, "body": {}}
+        url = urlparse(sub_request["url"])
+        status, data = self._run(sub_request["method"], unquote(url.path), parse_qs(url.query), sub_request.get("body"))
+        return {"id": sub_request["id"], "status": status, "body": data}
+
+    def _run(self, method, route, query, body):
+        search = re.match(r"/me/drive/root/search\(q='(.*)'\)$", route)
+        if method == "GET" and search:
+            words = search.group(1).lower().split()
+            return 200, [self._with_parent(item) for item in self.items.values() if all(word in item["name"].lower() for word in words)]
+
+        if method == "GET" and route.endswith("/delta"):
+            if query.get("token") == ["latest"]:
+                return 200, []
+            return 200, [self._with_parent(item) for item in self.items.values()]
+
+        children = re.match(r"/me/drive/items/([^/]+)/children$", route)
+        if children and method == "GET":
+            return 200, [item for item in self.items.values() if item["parentReference"]["id"] == children.group(1)]
+        if children and method == "POST":
+            return self._create_folder(children.group(1), body)
+
+        by_path = re.match(r"/me/drive/items/([^/:]+):/(.+)$", route)
+        if by_path and method == "GET":
+            for child in self.items.values():
+                if child["parentReference"]["id"] == by_path.group(1) and child["name"] == by_path.group(2):
+                    return 200, child
+            return 404, {"error": {"code": "itemNotFound", "message": "Item not found"}}
+
+        item = re.match(r"/me/drive/items/([^/]+)$", route)
+        if item and method == "PATCH":
+            with self._lock:
+                if item.group(1) not in self.items:
+                    return 404, {"error": {"code": "itemNotFound", "message": "Item not found"}}
+                self.items[item.group(1)]["parentReference"] = {"id": body["parentReference"]["id"]}
+                return 200, self.items[item.group(1)]
+        if item and method == "GET" and item.group(1) in self.items:
+            return 200, self.items[item.group(1)]
+
+        return 404, {"error": {"code": "itemNotFound", "message": f"No stub route for {method} {route}"}}
+
+    def _create_folder(self, parent_id, body):
+        with self._lock:
+            for item in self.items.values():
+                if item["parentReference"]["id"] == parent_id and item["name"] == body["name"]:
+                    return 409, {"error": {"code": "nameAlreadyExists", "message": "Name already exists"}}
+            folder_id = f"folder-{len(self.items)}"
+            self.items[folder_id] = {"id": folder_id, "name": body["name"], "folder": {}, "parentReference": {"id": parent_id}}
+            return 201, self.items[folder_id]
+
+    def _with_parent(self, item):
+        parent = self.items.get(item["parentReference"]["id"])
+        return dict(item, parentReference={"id": item["parentReference"]["id"], "name": parent["name"] if parent else item["parentReference"].get("name")})
+
+    @staticmethod
+    def _json(status, data):
+        return status, json.dumps(data).encode("utf-8"), {"Content-Type": "application/json"}
+
+
+# Answers the MAW series issues POST with a generated page per series ID
+class MAWStub(StubServer):
+
+    def __init__(self, series_by_sid=None, **kwargs):
+        super().__init__(**kwargs)
+        self.pages = {sid: make_maw_page(series) for sid, series in (series_by_sid or {}).items()}
+
+    def route(self, method, path, body):
+        sid = parse_qs(body.decode("utf-8")).get("seriesid", [None])[0]
+        if method != "POST" or sid not in self.pages:
+            return 404, b"", {}
+        return 200, self.pages[sid], {"Content-Type": "text/html; charset=utf-8"}
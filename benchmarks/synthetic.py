@@ -0,0 +1,84 @@
+import random
+from html import escape
+from tool_suite import MONTH_FOLDERS, MAWDataManager
+import pandas as pd
+
+MONTH_NAMES = ["January", "February", "March", "April", "May", "June",
+               "July", "August", "September", "October", "November", "December"]
+
+
+def make_series(issue_count, title="Example Series", start_year=1960):
+    # One issue per month from January of start_year: [(issue name, cover date), ...]
+    return [
+        (f"{title} #{number}", f"{MONTH_NAMES[(number - 1) % 12]} {start_year + (number - 1) // 12}")
+        for number in range(1, issue_count + 1)
+    ]
+
+
+def make_maw_page(series):
+    # Same layout as fixtures/maw_series_page.html, so it exercises the real parser
+    rows = []
+    for number, (issue_name, cover_date) in enumerate(series, 1):
+        rows.append(
+            f'        <tr class="{"odd" if number % 2 else "even"}">\n'
+            f'          <td><a href="/mikes/features/comic/issue.php?id={100000 + number}">{escape(issue_name)}</a></td>\n'
+            f'          <td>{cover_date}</td>\n'
+            f'          <td>{cover_date}</td>\n'
+            f'          <td>Writer {number}</td>\n'
+            f'        </tr>\n'
+        )
+    return (
+        "<!DOCTYPE html>\n<html>\n<head>\n  <title>Mike's Amazing World of Comics - Series Issues</title>\n</head>\n<body>\n"
+        '<table width="100%" class="layout">\n  <tr>\n    <td colspan="2">\n'
+        '      <table class="seriesissues">\n'
+        "        <tr>\n          <th>Issue</th>\n          <th>Cover Date</th>\n          <th>On Sale Date</th>\n          <th>Credits</th>\n        </tr>\n"
+        + "".join(rows) +
+        "      </table>\n    </td>\n  </tr>\n</table>\n</body>\n</html>\n"
+    ).encode("utf-8")
+
+
+def make_maw_frame(series):
+    data = pd.DataFrame(series, columns=["Issue Name", "Cover Date"])
+    return MAWDataManager.normalize_cover_dates(data)
+
+
+def make_folder_tree(publishers=("DC", "Marvel"), start_year=1960, end_year=2020, root_id="root0"):
+    # Returns the flat {id: (name, parent id)} map the Graph stub serves and the nested tree FolderTreeManager builds
+    folders = {root_id: ("Monthly Packages", None)}
+    tree = {"folder_id": root_id, "subfolders": {}}
+    for publisher in publishers:
+        publisher_id = f"{publisher}"
+        folders[publisher_id] = (publisher, root_id)
+        publisher_node = tree["subfolders"][publisher] = {"folder_id": publisher_id, "subfolders": {}}
+        for year in range(start_year, end_year + 1):
+            year_id = f"{publisher}-{year}"
+            folders[year_id] = (str(year), publisher_id)
+            year_node = publisher_node["subfolders"][str(year)] = {"folder_id": year_id, "subfolders": {}}
+            for month, month_name in MONTH_FOLDERS.items():
+                month_id = f"{publisher}-{year}-{month:02d}"
+                folders[month_id] = (month_name, year_id)
+                year_node["subfolders"][month_name] = {"folder_id": month_id}
+    return folders, tree
+
+
+def make_drive_items(item_count, series=None, title="Example Series", parent_id="inbox", seed=0):
+    # Files for every issue in series first, then unrelated files until the drive holds item_count items
+    rng = random.Random(seed)
+    items = []
+    for number, (_, cover_date) in enumerate(series or [], 1):
+        items.append({
+            "id": f"file-{number}",
+            "name": f"{title} {number:03d} ({cover_date.split()[-1]}).cbz",
+            "size": rng.randint(20, 80) * 1000000,
+            "file": {},
+            "parentReference": {"id": parent_id, "name": "Inbox"}
+        })
+    for number in range(len(items), item_count):
+        items.append({
+            "id": f"other-{number}",
+            "name": f"Other Series {rng.randint(1, 5000)} {rng.randint(1, 999):03d} ({rng.randint(1960, 2020)}).cbz",
+            "size": rng.randint(20, 80) * 1000000,
+            "file": {},
+            "parentReference": {"id": parent_id, "name": "Inbox"}
+        })
+    return items
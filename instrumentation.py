@@ -0,0 +1,238 @@
+import contextvars
+import logging
+import re
+import threading
+import time
+import uuid
+from functools import wraps
+import app_config
+
+# When disabled, timer() hands back one shared no-op object and counters return straight away
+ENABLED = getattr(app_config, "INSTRUMENTATION_ENABLED", True)
+SERVER_TIMING = getattr(app_config, "SERVER_TIMING_HEADER", False)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_trace_id = contextvars.ContextVar("trace_id", default=None)
+_timings = contextvars.ContextVar("timings", default=None)
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value, labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {"buckets": [0] * len(BUCKETS), "count": 0, "sum": 0.0, "max": 0.0}
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    histogram["buckets"][i] += 1
+                    break
+            histogram["count"] += 1
+            histogram["sum"] += seconds
+            histogram["max"] = max(histogram["max"], seconds)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": {MetricsRegistry.format_series(name, labels): value for (name, labels), value in self.counters.items()},
+                "histograms": {
+                    MetricsRegistry.format_series(name, labels): {"count": histogram["count"], "sum": histogram["sum"], "max": histogram["max"]}
+                    for (name, labels), histogram in self.histograms.items()
+                }
+            }
+
+    def render(self):
+        # Prometheus text exposition format 0.0.4; bucket counts are stored per bucket and summed here
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, dict(value, buckets=list(value["buckets"]))) for key, value in self.histograms.items())
+
+        lines = []
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{MetricsRegistry.format_series(name, labels)} {value}")
+        for (name, labels), histogram in histograms:
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS, histogram["buckets"]):
+                cumulative += bucket_count
+                lines.append(f"{MetricsRegistry.format_series(name + '_bucket', labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{MetricsRegistry.format_series(name + '_bucket', labels + (('le', '+Inf'),))} {histogram['count']}")
+            lines.append(f"{MetricsRegistry.format_series(name + '_sum', labels)} {histogram['sum']}")
+            lines.append(f"{MetricsRegistry.format_series(name + '_count', labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def format_series(name, labels):
+        if not labels:
+            return name
+        values = ",".join('%s="%s"' % (key, str(value).replace("\\", "\\\\").replace('"', '\\"')) for key, value in labels)
+        return "%s{%s}" % (name, values)
+
+
+registry = MetricsRegistry()
+
+
+class Timer:
+
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start, self.labels)
+        return False
+
+
+class NullTimer:
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = NullTimer()
+
+
+def set_enabled(enabled):
+    global ENABLED
+    ENABLED = enabled
+
+
+def timer(name, **labels):
+    if not ENABLED:
+        return NULL_TIMER
+    return Timer(name, labels)
+
+
+def timed(name, **labels):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with Timer(name, labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, value=1, **labels):
+    if ENABLED:
+        registry.inc(name, value, labels)
+
+
+def observe(name, seconds, **labels):
+    if ENABLED:
+        record(name, seconds, labels)
+
+
+def record(name, seconds, labels):
+    registry.observe(name, seconds, labels)
+    timings = _timings.get()
+    if timings is not None:
+        # Server-Timing entries are per metric and stage, not per label set, to keep the header short
+        key = name + ("." + labels["stage"] if "stage" in labels else "")
+        timings[key] = timings.get(key, 0.0) + seconds
+
+
+def start_trace(trace_id=None):
+    # Each request (or job) gets its own ID and timing breakdown; contextvars keep them apart across threads
+    trace_id = trace_id or uuid.uuid4().hex[:16]
+    _trace_id.set(trace_id)
+    _timings.set({})
+    return trace_id
+
+
+def get_trace_id():
+    return _trace_id.get()
+
+
+def get_timings():
+    return _timings.get() or {}
+
+
+class TraceIdFilter(logging.Filter):
+
+    def filter(self, log_record):
+        log_record.trace_id = _trace_id.get() or "-"
+        return True
+
+
+_logging_handler = None
+
+
+def configure_logging(level=None):
+    # Every log line carries the trace ID of the request or job that wrote it
+    global _logging_handler
+    root = logging.getLogger()
+    if _logging_handler is None:
+        _logging_handler = logging.StreamHandler()
+        _logging_handler.addFilter(TraceIdFilter())
+        _logging_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(trace_id)s] %(name)s: %(message)s"))
+        root.addHandler(_logging_handler)
+    root.setLevel(level or getattr(app_config, "LOG_LEVEL", "INFO"))
+
+
+def init_app(app):
+    from flask import Response, g, request
+
+    def begin_request():
+        g.request_start = time.perf_counter()
+        # Reuse an upstream request ID so logs can be joined with a proxy's
+        g.trace_id = start_trace(re.sub(r"[^A-Za-z0-9_-]", "", request.headers.get("X-Request-ID", ""))[:64] or None)
+
+    def finish_request(response):
+        response.headers["X-Request-ID"] = g.get("trace_id", "")
+        if not ENABLED or "request_start" not in g:
+            return response
+        elapsed = time.perf_counter() - g.request_start
+        registry.observe("http_request_seconds", elapsed, {
+            "endpoint": request.endpoint or "unknown",
+            "method": request.method,
+            "status": str(response.status_code)
+        })
+        if SERVER_TIMING:
+            entries = ["%s;dur=%.1f" % (re.sub(r"[^A-Za-z0-9_.-]", "_", key), seconds * 1000) for key, seconds in get_timings().items()]
+            entries.append("total;dur=%.1f" % (elapsed * 1000))
+            response.headers["Server-Timing"] = ", ".join(entries)
+        return response
+
+    def metrics():
+        return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+    app.before_request(begin_request)
+    app.after_request(finish_request)
+    if getattr(app_config, "METRICS_ENDPOINT_ENABLED", True):
+        app.add_url_rule("/metrics", "metrics", metrics)
@@ -0,0 +1,61 @@
+import argparse
+import json
+import time
+from tool_suite import MAWDataManager
+
+
+def read_sids(args):
+    sids = list(args.sids)
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as sid_file:
+            sids.extend(line.strip() for line in sid_file if line.strip() and not line.startswith("#"))
+    # Keep the first occurrence of each SID, in order
+    return list(dict.fromkeys(sids))
+
+
+def summarize(stats, wall_seconds):
+    timings = sorted(entry["seconds"] for entry in stats)
+    failed = [entry for entry in stats if entry["error"]]
+    return {
+        "series": len(stats),
+        "succeeded": len(stats) - len(failed),
+        "failed": len(failed),
+        "wall_seconds": wall_seconds,
+        "p50_seconds": timings[len(timings) // 2] if timings else 0.0,
+        "max_seconds": timings[-1] if timings else 0.0,
+        "failures": [{"sid": entry["sid"], "error": entry["error"]} for entry in failed]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch MAW series data for many series IDs into the local cache")
+    parser.add_argument("sids", nargs="*", help="Series IDs to fetch")
+    parser.add_argument("--file", help="File with one series ID per line")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent requests")
+    parser.add_argument("--rate", type=float, default=2.0, help="Maximum requests per second per host")
+    parser.add_argument("--retries", type=int, default=3, help="Retries per series on throttling or server errors")
+    parser.add_argument("--url", help="Override the MAW series issues URL, e.g. a local stub server")
+    parser.add_argument("--json", action="store_true", help="Print per-SID stats and the summary as JSON")
+    args = parser.parse_args()
+
+    sids = read_sids(args)
+    if not sids:
+        parser.error("no series IDs given")
+
+    start = time.perf_counter()
+    stats = MAWDataManager.bulk_fetch_MAW_data(sids, url=args.url, max_workers=args.workers, rate=args.rate, max_retries=args.retries)
+    summary = summarize(stats, time.perf_counter() - start)
+
+    if args.json:
+        print(json.dumps({"series": stats, "summary": summary}, indent=2))
+        return
+
+    for entry in stats:
+        status = entry["error"] or "OK"
+        print(f"{entry['sid']:>10}  {entry['rows']:>6} issues  {entry['seconds']:7.2f}s  {entry['attempts']} attempt(s)  {status}")
+    print(f"{summary['succeeded']}/{summary['series']} series fetched in {summary['wall_seconds']:.2f}s "
+          f"(p50 {summary['p50_seconds']:.2f}s, max {summary['max_seconds']:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
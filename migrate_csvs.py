@@ -0,0 +1,15 @@
+import argparse
+from tool_suite import CSVManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import the legacy per-series CSV files into the MAW data store")
+    parser.add_argument("--remove", action="store_true", help="Delete each CSV file once it has been imported")
+    args = parser.parse_args()
+
+    migrated = CSVManager.migrate_csvs(remove=args.remove)
+    print(f"Migrated {len(migrated)} series into {CSVManager.FILEROOT}/{CSVManager.DATABASE}")
+
+
+if __name__ == "__main__":
+    main()
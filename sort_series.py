@@ -0,0 +1,224 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from tool_suite import CoverDateCorrector, CSVManager, MAWCache, MAWDataManager
+from app.batch_manager import BatchManager
+from app.drive_index_manager import DriveIndexManager
+from app.folder_tree_manager import FolderTreeManager
+from app.graph_client import GraphClient
+import app_config
+
+STAGES = ["fetch_maw", "filter", "search_drive", "plan", "move"]
+
+
+def read_manifest(path):
+    # CSV with sid, search_term and publisher columns (filter is optional), or a JSON list of the same objects
+    with open(path, "r", encoding="utf-8") as manifest_file:
+        if path.lower().endswith(".json"):
+            entries = json.load(manifest_file)
+        else:
+            entries = list(csv.DictReader(line for line in manifest_file if line.strip() and not line.startswith("#")))
+
+    for number, entry in enumerate(entries, 1):
+        missing = [key for key in ("sid", "search_term", "publisher") if not entry.get(key)]
+        if missing:
+            raise ValueError(f"Manifest entry {number} is missing {', '.join(missing)}")
+    return entries
+
+
+def get_monthly_packages_id(client):
+    data = client.get_json("/me/drive/root/search(q='Monthly%20Packages')")
+    for drive_item in data.get("value", []):
+        if drive_item.get("name") == "Monthly Packages":
+            return drive_item["id"]
+    raise ValueError("Monthly Packages folder not found")
+
+
+def iter_search_pages(access_token, user_id, search_term, live_search):
+    if not live_search:
+        result = DriveIndexManager(access_token, user_id).search(search_term)
+        if result is not None:
+            yield {"value": result}
+            return
+    url = "/me/drive/root/search(q='%s')?select=name,parentReference,id" % (search_term)
+    yield from GraphClient(access_token).prefetch_pages(url)
+
+
+def prefetch_maw_data(entries, rate):
+    # Missing and stale series go through the bulk fetcher's per-host rate limit and backoff up front, so the planning
+    # workers read them from the store; returns {sid: error} for the series that could not be fetched
+    sids = [sid for sid in dict.fromkeys(str(entry["sid"]) for entry in entries) if needs_fetch(sid)]
+    if not sids:
+        return {}
+    stats = MAWDataManager.bulk_fetch_MAW_data(sids, rate=rate)
+    return {entry["sid"]: entry["error"] for entry in stats if entry["error"]}
+
+
+def needs_fetch(sid):
+    fetched_at = CSVManager.get_fetched_at(sid)
+    return fetched_at is None or MAWCache.is_stale(sid, fetched_at)
+
+
+def plan_series(entry, access_token, user_id, folder_dict, live_search, maw_error=None):
+    # Every stage but the move runs here, one series per worker; moves from all series are batched together afterwards
+    timings = {}
+    stage_start = time.perf_counter()
+    stage = "fetch_maw"
+    cdc = CoverDateCorrector()
+    try:
+        if maw_error:
+            raise ValueError(f"MAW fetch failed: {maw_error}")
+        cdc.set_SID(str(entry["sid"]))
+        cdc.maw_data.load_MAW_data()
+        if cdc.maw_data.active_data.empty:
+            raise ValueError("no issues found on MAW")
+        timings[stage] = time.perf_counter() - stage_start
+
+        stage_start, stage = time.perf_counter(), "filter"
+        for term in (entry.get("filter") or "").split(";"):
+            if term.strip():
+                cdc.maw_data.data_filter.add_filter(term.strip())
+        cdc.maw_data.filter_active_data()
+        timings[stage] = time.perf_counter() - stage_start
+
+        stage_start, stage = time.perf_counter(), "search_drive"
+        for _ in cdc.drive_data.ingest_graph_pages(iter_search_pages(access_token, user_id, entry["search_term"], live_search)):
+            pass
+        timings[stage] = time.perf_counter() - stage_start
+
+        stage_start, stage = time.perf_counter(), "plan"
+        cdc.drive_data.set_folder_data(folder_dict)
+        plan, unresolved_data = cdc.create_move_plan(entry["publisher"])
+        timings[stage] = time.perf_counter() - stage_start
+    except Exception as e:
+        # Any failure is reported against its series, so one bad series never stops the rest of the batch
+        timings[stage] = time.perf_counter() - stage_start
+        return {"sid": str(entry["sid"]), "error": f"{stage}: {type(e).__name__}: {e}", "timings": timings, "plan": None}
+
+    return {
+        "sid": str(entry["sid"]),
+        "error": None,
+        "timings": timings,
+        "plan": plan,
+        "counts": dict(
+            CoverDateCorrector.get_plan_summary(plan, unresolved_data),
+            issues=len(cdc.maw_data.active_data),
+            files=len(cdc.drive_data.active_data),
+            unmatched_files=len(cdc.unmatched_files)
+        )
+    }
+
+
+def move_planned_files(results, access_token):
+    planned = [result for result in results if result["plan"] is not None]
+    moves = [CoverDateCorrector.get_final_data(result["plan"]).assign(SID=result["sid"]) for result in planned]
+    final_data = pd.concat(moves, ignore_index=True) if moves else pd.DataFrame(columns=["File ID", "Destination ID", "SID"])
+
+    start = time.perf_counter()
+    move_results = BatchManager(access_token).move_files(final_data) if not final_data.empty else final_data.assign(Error=None)
+    seconds = time.perf_counter() - start
+
+    move_results["SID"] = final_data["SID"].to_numpy()
+    for result in planned:
+        series_moves = move_results[move_results["SID"] == result["sid"]]
+        failed = BatchManager.get_failed_moves(series_moves)
+        result["counts"]["moved"] = len(series_moves) - len(failed)
+        result["counts"]["failed"] = len(failed)
+        result["failures"] = failed[["File ID", "Error"]].values.tolist()
+        # The batch is shared, so each series is charged its share of the move time
+        result["timings"]["move"] = seconds * len(series_moves) / max(len(final_data), 1)
+
+
+def summarize(results, wall_seconds):
+    stage_seconds = {stage: [result["timings"][stage] for result in results if stage in result["timings"]] for stage in STAGES}
+    failed = [result for result in results if result["error"]]
+    totals = {}
+    for result in results:
+        for key, value in result.get("counts", {}).items():
+            totals[key] = totals.get(key, 0) + value
+    return {
+        "series": len(results),
+        "succeeded": len(results) - len(failed),
+        "failed": len(failed),
+        "wall_seconds": wall_seconds,
+        "totals": totals,
+        "stages": {
+            stage: {"total_seconds": sum(seconds), "max_seconds": max(seconds)}
+            for stage, seconds in stage_seconds.items() if seconds
+        },
+        "failures": [{"sid": result["sid"], "error": result["error"]} for result in failed]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sort comic files into Monthly Packages folders for many series without the web app")
+    parser.add_argument("manifest", help="CSV or JSON manifest of sid, search_term, publisher and optional filter entries")
+    parser.add_argument("--access-token", help="Graph access token; defaults to the GRAPH_ACCESS_TOKEN environment variable")
+    parser.add_argument("--workers", type=int, default=8, help="Series processed at the same time")
+    parser.add_argument("--root-folder-id", help="ID of the Monthly Packages folder; looked up by name when omitted")
+    parser.add_argument("--user-id", default="headless", help="Key for the folder tree cache and drive index")
+    parser.add_argument("--live-search", action="store_true", help="Search OneDrive directly instead of the local drive index")
+    parser.add_argument("--rebuild-tree", action="store_true", help="Rebuild the cached folder tree before planning")
+    parser.add_argument("--maw-rate", type=float, default=2.0, help="Maximum MAW requests per second while prefetching series")
+    parser.add_argument("--dry-run", action="store_true", help="Plan the moves without moving any files")
+    parser.add_argument("--json", action="store_true", help="Print per-series results and the summary as JSON")
+    args = parser.parse_args()
+
+    access_token = args.access_token or os.environ.get("GRAPH_ACCESS_TOKEN")
+    if not access_token:
+        parser.error("no access token given; use --access-token or set GRAPH_ACCESS_TOKEN")
+    entries = read_manifest(args.manifest)
+    # A background revalidation would refetch data this run never uses and keep the process alive until it finished
+    MAWCache.configure(
+        ttl_days=getattr(app_config, "MAW_CACHE_TTL_DAYS", None),
+        series_ttl_days=getattr(app_config, "MAW_CACHE_SERIES_TTL_DAYS", None),
+        stale_while_revalidate=False
+    )
+
+    start = time.perf_counter()
+    # The folder tree is loaded once and shared by every series; Graph calls share GraphClient's pooled session
+    root_folder_id = args.root_folder_id or get_monthly_packages_id(GraphClient(access_token))
+    folder_dict = FolderTreeManager(access_token).load_folder_structure(root_folder_id, args.user_id, force_rebuild=args.rebuild_tree)
+    if not args.live_search:
+        DriveIndexManager(access_token, args.user_id).sync(max_age=0)
+
+    maw_errors = prefetch_maw_data(entries, args.maw_rate)
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        results = list(executor.map(
+            lambda entry: plan_series(entry, access_token, args.user_id, folder_dict, args.live_search, maw_errors.get(str(entry["sid"]))),
+            entries
+        ))
+    if not args.dry_run:
+        move_planned_files(results, access_token)
+    summary = summarize(results, time.perf_counter() - start)
+
+    if args.json:
+        series = [{key: value for key, value in result.items() if key != "plan"} for result in results]
+        print(json.dumps({"series": series, "summary": summary}, indent=2))
+        return 1 if summary["failed"] or summary["totals"].get("failed") else 0
+
+    for result in results:
+        if result["error"]:
+            print(f"{result['sid']:>10}  FAILED  {result['error']}")
+            continue
+        counts = result["counts"]
+        seconds = sum(result["timings"].values())
+        moved = f"{counts['moved']} moved, {counts['failed']} failed" if "moved" in counts else "not moved"
+        print(f"{result['sid']:>10}  {counts['moves']:>5} moves  {counts['no_ops']:>5} in place  {counts['reviews']:>4} to review  "
+              f"{counts['conflicts']:>4} conflicts  "
+              f"{counts['unresolved']:>4} unresolved  {moved}  {seconds:6.2f}s")
+    for stage, stats in summary["stages"].items():
+        print(f"{stage:>12}  {stats['total_seconds']:8.2f}s total  {stats['max_seconds']:6.2f}s max")
+    print(f"{summary['succeeded']}/{summary['series']} series planned in {summary['wall_seconds']:.2f}s")
+    # Non-zero when a series could not be planned or a move failed, so schedulers notice
+    return 1 if summary["failed"] or summary["totals"].get("failed") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
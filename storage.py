@@ -0,0 +1,41 @@
+import os
+import re
+import sqlite3
+import tempfile
+
+# Local disk helpers shared by the managers that keep SQLite tables, caches and journals
+
+
+def get_thread_connection(local, path, schema=None, row_factory=None):
+    # One connection per thread; sqlite3 connections must not be shared across threads
+    connection = getattr(local, "connection", None)
+    if connection is None:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        connection = sqlite3.connect(path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        if row_factory is not None:
+            connection.row_factory = row_factory
+        if schema:
+            connection.executescript(schema)
+        local.connection = connection
+    return connection
+
+
+def write_atomic(path, write, binary=False):
+    # write(file) fills a temporary file next to path, which then replaces it, so readers never see a partial file.
+    # mkstemp gives every writer its own file, created with 0600, and the rename keeps those permissions
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb" if binary else "w", encoding=None if binary else "utf-8") as temp_file:
+            write(temp_file)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def safe_key(*parts):
+    # "user@x.com", "01ABC!" -> "user_x.com_01ABC_", usable as a file name on every platform
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", "_".join(str(part) for part in parts))
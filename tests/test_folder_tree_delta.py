@@ -0,0 +1,89 @@
+import pytest
+import requests
+from benchmarks.stubs import GraphStub
+from app.folder_tree_manager import FolderTreeManager
+
+
+def folder(folder_id, name, parent_id):
+    return {"id": folder_id, "name": name, "folder": {}, "parentReference": {"id": parent_id}}
+
+
+def make_cache(url, delta_scope):
+    return {
+        "root_folder_id": "root0",
+        "delta_scope": delta_scope,
+        "delta_link": f"{url}/me/drive/root/delta?token=previous",
+        "folders": {"DC": {"name": "DC", "parent_id": "root0"}, "moved": {"name": "Moved", "parent_id": "DC"}}
+    }
+
+
+# A drive-wide delta after: a publisher and year were added, "moved" left the tree and unrelated folders changed
+DRIVE_CHANGES = [
+    folder("root0", "Monthly Packages", "drive-root"),
+    folder("Marvel", "Marvel", "root0"),
+    folder("Marvel-1990", "1990", "Marvel"),
+    folder("moved", "Moved", "elsewhere"),
+    folder("photos", "Photos", "drive-root"),
+    {"id": "file-1", "name": "Example Series 001.cbz", "file": {}, "parentReference": {"id": "DC"}}
+]
+
+
+def test_drive_scope_keeps_only_folders_under_the_root():
+    with GraphStub(items=DRIVE_CHANGES) as stub:
+        cache = FolderTreeManager("token", graph_url=stub.url)._apply_delta(make_cache(stub.url, "drive"))
+
+    assert cache["folders"] == {
+        "DC": {"name": "DC", "parent_id": "root0"},
+        "Marvel": {"name": "Marvel", "parent_id": "root0"},
+        "Marvel-1990": {"name": "1990", "parent_id": "Marvel"}
+    }
+    assert cache["delta_link"].endswith("token=latest")
+
+
+def test_folder_scope_takes_every_folder():
+    with GraphStub(items=DRIVE_CHANGES[1:3]) as stub:
+        cache = FolderTreeManager("token", graph_url=stub.url)._apply_delta(make_cache(stub.url, "folder"))
+
+    assert set(cache["folders"]) == {"DC", "moved", "Marvel", "Marvel-1990"}
+
+
+def test_deleted_folders_are_removed():
+    deleted = dict(folder("moved", "Moved", "DC"), deleted={"state": "deleted"})
+    with GraphStub(items=[deleted]) as stub:
+        cache = FolderTreeManager("token", graph_url=stub.url)._apply_delta(make_cache(stub.url, "folder"))
+
+    assert set(cache["folders"]) == {"DC"}
+
+
+def test_cache_without_delta_support_is_served_as_is():
+    cache = {"root_folder_id": "root0", "delta_scope": None, "delta_link": None, "folders": {"DC": {"name": "DC", "parent_id": "root0"}}}
+    assert FolderTreeManager("token", graph_url="http://127.0.0.1:9")._apply_delta(dict(cache)) == cache
+
+
+def test_cache_from_before_delta_scopes_is_rebuilt():
+    cache = {"root_folder_id": "root0", "delta_link": None, "folders": {}}
+    assert FolderTreeManager("token", graph_url="http://127.0.0.1:9")._apply_delta(cache) is None
+
+
+def test_expired_delta_token_forces_a_rebuild():
+    class ExpiredStub(GraphStub):
+        def _run(self, method, route, query, body):
+            return 410, {"error": {"code": "resyncRequired", "message": "Resync required"}}
+
+    with ExpiredStub() as stub:
+        assert FolderTreeManager("token", graph_url=stub.url)._apply_delta(make_cache(stub.url, "drive")) is None
+
+
+def test_failed_listing_fails_the_rebuild_without_caching(tmp_path, monkeypatch):
+    class FailingStub(GraphStub):
+        def _run(self, method, route, query, body):
+            if route == "/me/drive/items/Marvel/children":
+                return 404, {"error": {"code": "itemNotFound", "message": "Item not found"}}
+            return super()._run(method, route, query, body)
+
+    monkeypatch.setattr(FolderTreeManager, "CACHEROOT", str(tmp_path))
+    with FailingStub(folders={"DC": ("DC", "root0"), "Marvel": ("Marvel", "root0")}) as stub:
+        with pytest.raises(requests.exceptions.HTTPError):
+            FolderTreeManager("token", graph_url=stub.url).load_folder_structure("root0", "user")
+
+    assert list(tmp_path.iterdir()) == []
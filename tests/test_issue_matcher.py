@@ -0,0 +1,39 @@
+import pandas as pd
+from tool_suite import CoverDateCorrector, IssueMatcher
+
+
+def match(file_names, issue_names, year="1987"):
+    files = pd.DataFrame({"File Name": file_names})
+    issues = pd.DataFrame({"Issue Name": issue_names, "Year": [year] * len(issue_names)})
+    matched, unmatched_files, unmatched_issues = IssueMatcher().match(files, issues)
+    return dict(zip(matched["File Name"], zip(matched["Issue Name"], matched["Confidence"]))), unmatched_files, unmatched_issues
+
+
+def test_title_and_issue_match_is_certain():
+    pairs, _, _ = match(["Batman v2 #012 (1987) (Digital).cbz", "The Batman 013.cbz"], ["Batman #12", "Batman #13"])
+    assert pairs == {"Batman v2 #012 (1987) (Digital).cbz": ("Batman #12", 1.0), "The Batman 013.cbz": ("Batman #13", 1.0)}
+
+
+def test_different_issue_numbers_never_pair():
+    pairs, unmatched_files, unmatched_issues = match(["Batman 005.cbz"], ["Batman #6"])
+    assert pairs == {}
+    assert unmatched_files["File Name"].tolist() == ["Batman 005.cbz"]
+    assert unmatched_issues["Issue Name"].tolist() == ["Batman #6"]
+
+
+def test_issue_number_passes_check_the_title():
+    pairs, unmatched_files, _ = match(["Detective Comics 009.cbz", "Batman and Robin 008 (1987).cbz"], ["Batman #9", "Batman #8"])
+    assert "Detective Comics 009.cbz" in unmatched_files["File Name"].tolist()
+    assert pairs["Batman and Robin 008 (1987).cbz"][0] == "Batman #8"
+    assert pairs["Batman and Robin 008 (1987).cbz"][1] < CoverDateCorrector.REVIEW_CONFIDENCE
+
+
+def test_untitled_file_matches_on_issue_number():
+    pairs, _, _ = match(["011.cbz"], ["Batman #11"])
+    assert pairs == {"011.cbz": ("Batman #11", 0.8)}
+
+
+def test_fuzzy_match_breaks_title_ties_within_the_issue_number():
+    pairs, _, _ = match(["Batmann #3.cbz"], ["Batman #3", "Detective Comics #3", "Batman #4"])
+    assert pairs["Batmann #3.cbz"][0] == "Batman #3"
+    assert pairs["Batmann #3.cbz"][1] < CoverDateCorrector.REVIEW_CONFIDENCE
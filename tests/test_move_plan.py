@@ -0,0 +1,52 @@
+from benchmarks.synthetic import make_series, make_maw_frame, make_folder_tree, make_drive_items
+from tool_suite import CoverDateCorrector
+
+
+def make_corrector(drive_items, series):
+    cdc = CoverDateCorrector()
+    cdc.maw_data.active_data = make_maw_frame(series)
+    cdc.drive_data.parse_graph_response_to_data_frame(drive_items)
+    cdc.drive_data.set_folder_data(make_folder_tree(publishers=("DC",), start_year=1960, end_year=1961)[1])
+    return cdc
+
+
+def get_actions(plan):
+    return dict(zip(plan["File Name"], plan["Action"]))
+
+
+def test_plan_marks_moves_no_ops_and_fuzzy_reviews():
+    series = make_series(4) + [("Example Series Annual #3", "June 1960")]
+    items = make_drive_items(4, series[:4])
+    items[1]["parentReference"] = {"id": "DC-1960-02", "name": "February"}
+    # Issue 3 is on MAW twice, so this file can only be paired by the fuzzy pass
+    items[2]["name"] = "Exampel Series #3.cbz"
+    plan, unresolved_data = make_corrector(items, series).create_move_plan("DC")
+
+    assert get_actions(plan) == {
+        "Example Series 001 (1960).cbz": "Move",
+        "Example Series 002 (1960).cbz": "No-op",
+        "Exampel Series #3.cbz": "Review",
+        "Example Series 004 (1960).cbz": "Move"
+    }
+    assert CoverDateCorrector.get_plan_summary(plan, unresolved_data) == {"moves": 2, "no_ops": 1, "reviews": 1, "conflicts": 0, "unresolved": 0}
+
+
+def test_final_data_only_includes_reviews_when_asked():
+    series = make_series(3) + [("Example Series Annual #3", "June 1960")]
+    items = make_drive_items(3, series[:3])
+    items[2]["name"] = "Exampel Series #3.cbz"
+    plan, _ = make_corrector(items, series).create_move_plan("DC")
+
+    assert sorted(CoverDateCorrector.get_final_data(plan)["File ID"]) == ["file-1", "file-2"]
+    assert sorted(CoverDateCorrector.get_final_data(plan, include_review=True)["File ID"]) == ["file-1", "file-2", "file-3"]
+
+
+def test_move_onto_an_existing_name_is_a_conflict():
+    series = make_series(2)
+    items = make_drive_items(2, series)
+    # A copy already sits in the month folder; with the name on the drive twice the pairing is left to the fuzzy pass
+    items.append(dict(items[0], id="already-there", parentReference={"id": "DC-1960-01", "name": "January"}))
+    plan, _ = make_corrector(items, series).create_move_plan("DC")
+
+    assert get_actions(plan) == {"Example Series 001 (1960).cbz": "Conflict", "Example Series 002 (1960).cbz": "Move"}
+    assert CoverDateCorrector.get_final_data(plan, include_review=True)["File ID"].tolist() == ["file-2"]
@@ -1,18 +1,68 @@
 import json
+import logging
 import os
-from datetime import date
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from urllib.parse import quote
+import numpy as np
 import pandas as pd
-from MAW_Fetch import MAWFetcher
+from MAW_Fetch import MAWFetcher, MAWBulkFetcher
+import instrumentation
+import storage
+
+logger = logging.getLogger(__name__)
+
+MONTH_FOLDERS = {
+    1: "01 - January",
+    2: "02 - February",
+    3: "03 - March",
+    4: "04 - April",
+    5: "05 - May",
+    6: "06 - June",
+    7: "07 - July",
+    8: "08 - August",
+    9: "09 - September",
+    10: "10 - October",
+    11: "11 - November",
+    12: "12 - December"
+}
+
+# Cover date periods MAW uses in place of (or in addition to) a month name
+COVER_MONTHS = {
+    **{folder.split(" - ")[1].lower(): month for month, folder in MONTH_FOLDERS.items()},
+    **{folder.split(" - ")[1][:3].lower(): month for month, folder in MONTH_FOLDERS.items()},
+    "sept": 9,
+    "winter": 1,
+    "spring": 4,
+    "summer": 7,
+    "fall": 10,
+    "autumn": 10,
+    "holiday": 12
+}
+
+# e.g. "January 1985", "Late December 1985", "Winter 1985", "1985"; bi-monthly "Feb/Mar 1987" and
+# "February-March 1987" are filed under their first month
+COVER_DATE_PATTERN = r"^\s*(?:(?:early|mid|late)\s+)?(?:(?P<period>[a-z]+)\.?(?:\s*[/-]\s*[a-z]+\.?)?)?\s*(?P<year>\d{4})\s*$"
 
 #Single Purpose: To organize comics based on their cover date
 class CoverDateCorrector():
 
+    # Pairs scored below this (the fuzzy title matches) are planned as Review instead of Move
+    REVIEW_CONFIDENCE = 0.8
+
     def __init__(self):
         self.seriesid = None
         self.final_filtered_data = None
         self.final_drive_data = None
         self.maw_data = MAWDataManager()
         self.drive_data = DriveDataManager()
+        self.matched_data = None
+        self.unmatched_files = None
+        self.unmatched_issues = None
 
     def reset_corrector(self):
         self.seriesid = None
@@ -20,6 +70,38 @@ class CoverDateCorrector():
         self.final_drive_data = None
         self.maw_data = MAWDataManager()
         self.drive_data = DriveDataManager()
+        self.matched_data = None
+        self.unmatched_files = None
+        self.unmatched_issues = None
+
+    def get_state(self):
+        # Only what the workflow needs to resume; the filtered MAW frame is stored as row labels
+        return {
+            "seriesid": self.seriesid,
+            "maw_unfiltered_data": self.maw_data.unfiltered_data,
+            "maw_active_index": self.maw_data.active_data.index.to_numpy(),
+            "filter_strings": self.maw_data.data_filter.filter_strings,
+            "filter_term_masks": self.maw_data.data_filter.get_state(),
+            "drive_active_data": self.drive_data.active_data,
+            "folder_dict": self.drive_data.folder_dict,
+            "monthly_packages_id": self.drive_data.monthly_packages_id
+        }
+
+    @staticmethod
+    def from_state(state):
+        cdc = CoverDateCorrector()
+        if state["seriesid"] is not None:
+            cdc.set_SID(state["seriesid"])
+        cdc.maw_data.unfiltered_data = state["maw_unfiltered_data"]
+        cdc.maw_data.active_data = state["maw_unfiltered_data"].loc[state["maw_active_index"]]
+        cdc.maw_data.data_filter.filter_strings = state["filter_strings"]
+        if state.get("filter_term_masks"):
+            cdc.maw_data.data_filter.restore_state(state["filter_term_masks"], cdc.maw_data.unfiltered_data)
+        cdc.drive_data.active_data = state["drive_active_data"]
+        if state["folder_dict"] is not None:
+            cdc.drive_data.set_folder_data(state["folder_dict"])
+        cdc.drive_data.monthly_packages_id = state["monthly_packages_id"]
+        return cdc
 
     def set_SID(self, sid):
         self.seriesid = sid
@@ -30,108 +112,422 @@ class CoverDateCorrector():
         self.maw_data.filter_active_data()
         return self.maw_data.get_active_MAW_data()
     
-    def add_filter_to_MAW_data(self, filter_term):
-        self.maw_data.data_filter.add_filter(filter_term)
+    def add_filter_to_MAW_data(self, filter_term, is_regex=False):
+        self.maw_data.data_filter.add_filter(filter_term, is_regex)
         self.maw_data.filter_active_data()
         return self.maw_data.get_active_MAW_data()
     
+    @instrumentation.timed("dataframe_stage_seconds", stage="match")
+    def match_data(self):
+        # Pairs drive files with MAW issues by parsed title/issue/year rather than by position
+        self.matched_data, self.unmatched_files, self.unmatched_issues = IssueMatcher().match(
+            self.drive_data.active_data,
+            self.maw_data.active_data
+        )
+        return self.matched_data
+
+    @instrumentation.timed("dataframe_stage_seconds", stage="preview")
     def create_preview_data(self):
-        destinations = self.extract_destination_folders()
-        file_names = self.drive_data.active_data['File Name'].tolist()
-        print(self.maw_data.active_data)
-        issue_names = self.maw_data.active_data['Issue Name'].tolist()
-        cover_dates = self.maw_data.active_data['Cover Date'].tolist()
+        matched = self.match_data()
         preview_list = pd.DataFrame(
             {
-                "File Name": file_names,
-                "Issue Name": issue_names,
-                "Cover Date": cover_dates,
-                "Destination Folder": destinations
+                "File Name": matched['File Name'],
+                "Issue Name": matched['Issue Name'],
+                "Cover Date": matched['Cover Date'],
+                "Destination Folder": self.extract_destination_folders(matched),
+                "Confidence": matched['Confidence']
             }
         )
         return preview_list
     
-    def create_final_data(self, publisher):
-        file_ids = self.drive_data.active_data['File ID'].tolist()
-        months = self.maw_data.active_data["Month"].tolist()
-        years = self.maw_data.active_data["Year"].tolist()
-        destination_folder_ids = []
-
-        for i in range(len(file_ids)):
-            year = years[i]
-            month = self.format_month(months[i])
-
-            # Initialize the destination to the root of the folder_dict
-            destination = self.drive_data.folder_dict
-
-            # Check if the 'publisher' exists in the structure
-            if publisher in destination['subfolders']:
-                destination = destination['subfolders'][publisher]
-
-                # Check if the 'year' exists in the publisher's subfolders
-                if year in destination['subfolders']:
-                    destination = destination['subfolders'][year]
-
-                    # Check if the 'month' exists in the year's subfolders
-                    if month in destination['subfolders']:
-                        destination = destination['subfolders'][month]
-
-                        # Get the final folder ID
-                        folder_id = destination['folder_id']
-                        destination_folder_ids.append(folder_id)
-                    else:
-                        # Handle the case when 'month' doesn't exist
-                        print(f"Month {month} not found in the folder structure.")
-                else:
-                    # Handle the case when 'year' doesn't exist
-                    print(f"Year {year} not found in the folder structure.")
-            else:
-                # Handle the case when 'publisher' doesn't exist
-                print(f"Publisher {publisher} not found in the folder structure.")
-        final_data = pd.DataFrame({
-            'File ID': file_ids,
-            'Destination ID': destination_folder_ids
-        })
-        return final_data
-    
-    def extract_destination_folders(self):
-        destination_folders = []
-        self.maw_data.split_active_data_dates()
+    @staticmethod
+    def get_final_data(plan, include_review=False):
+        # Only the rows that change something are sent; Review rows only once a person has confirmed them
+        actions = ["Move", "Review"] if include_review else ["Move"]
+        return plan.loc[plan["Action"].isin(actions), ['File ID', 'Destination ID']].reset_index(drop=True)
+
+    @instrumentation.timed("dataframe_stage_seconds", stage="plan")
+    def create_move_plan(self, publisher):
+        # Dry run: every resolvable file is marked Move, No-op (already in its month folder), Review (fuzzy match) or Conflict
+        matched = self.match_data()
+
+        destinations = self.drive_data.resolve_destinations(
+            publisher,
+            matched["Year"].astype("string").to_numpy(),
+            self.format_month(matched["Month"]).to_numpy()
+        )
+        destinations.insert(0, 'File ID', matched['File ID'].to_numpy())
+        destinations.insert(1, 'File Name', matched['File Name'].to_numpy())
+        # Drive data saved before parent IDs were kept plans every file as a move
+        destinations.insert(2, 'Parent ID', matched.get('Parent ID', pd.Series(None, index=matched.index, dtype=object)).to_numpy())
+        destinations.insert(3, 'Confidence', matched['Confidence'].to_numpy())
+
+        resolved = destinations['Destination ID'].notna()
+        plan = destinations.loc[resolved, ['File ID', 'File Name', 'Parent ID', 'Destination ID', 'Confidence']].reset_index(drop=True)
+        unresolved_data = destinations.loc[~resolved].reset_index(drop=True)
+
+        plan["Action"] = np.where(plan["Parent ID"] == plan["Destination ID"], "No-op", "Move")
+        plan.loc[(plan["Confidence"] < CoverDateCorrector.REVIEW_CONFIDENCE) & (plan["Action"] == "Move"), "Action"] = "Review"
+        plan.loc[self.find_move_conflicts(plan) & plan["Action"].isin(["Move", "Review"]), "Action"] = "Conflict"
+        return plan, unresolved_data
+
+    def find_move_conflicts(self, plan):
+        # OneDrive refuses a move onto an existing name, so compare where every known file will end up
+        drive = self.drive_data.active_data
+        staying = drive.loc[~drive["File ID"].isin(plan["File ID"])] if "Parent ID" in drive.columns else drive.iloc[0:0]
+        final_locations = pd.concat([
+            pd.DataFrame({"Folder": plan["Destination ID"], "Name": plan["File Name"].str.lower(), "Planned": True}),
+            pd.DataFrame({"Folder": staying.get("Parent ID"), "Name": staying["File Name"].str.lower(), "Planned": False})
+        ], ignore_index=True)
+        clashes = final_locations.duplicated(["Folder", "Name"], keep=False)
+        return clashes[final_locations["Planned"]].to_numpy()
 
-        for index, row in self.maw_data.active_data.iterrows():
-            month = self.format_month(row["Month"])
-            year = row["Year"]
+    @staticmethod
+    def get_plan_summary(plan, unresolved_data):
+        counts = plan["Action"].value_counts()
+        return {
+            "moves": int(counts.get("Move", 0)),
+            "no_ops": int(counts.get("No-op", 0)),
+            "reviews": int(counts.get("Review", 0)),
+            "conflicts": int(counts.get("Conflict", 0)),
+            "unresolved": len(unresolved_data)
+        }
 
-            destination_folder = f"root/Comics/Monthly Packages/[Publisher]/{year}/{month}"
-            
-            destination_folders.append(destination_folder)
-        
-        return destination_folders
-
-    def format_month(self, month_name):
-            # Define a dictionary to map month names to month numbers
-        month_mapping = {
-            'January': '01 - January',
-            'February': '02 - February',
-            'March': '03 - March',
-            'April': '04 - April',
-            'May': '05 - May',
-            'June': '06 - June',
-            'July': '07 - July',
-            'August': '08 - August',
-            'September': '09 - September',
-            'October': '10 - October',
-            'November': '11 - November',
-            'December': '12 - December'
+    @instrumentation.timed("dataframe_stage_seconds", stage="destinations")
+    def extract_destination_folders(self, maw_rows=None):
+        if maw_rows is None:
+            maw_rows = self.maw_data.active_data
+        years = maw_rows["Year"].astype("string").fillna("Unknown Year")
+        return "root/Comics/Monthly Packages/[Publisher]/" + years + "/" + self.format_month(maw_rows["Month"])
+
+    @staticmethod
+    @instrumentation.timed("dataframe_stage_seconds", stage="page")
+    def get_data_page(data, offset=0, limit=50, sort=None, descending=False):
+        # "Position" is the 1-based row number in the workflow order, independent of the display sort
+        page = data.assign(Position=range(1, len(data) + 1))
+        if sort in page.columns:
+            page = page.sort_values(by=sort, ascending=not descending, kind="stable")
+        page = page.iloc[offset:offset + limit]
+        return {
+            "total": len(data),
+            "offset": offset,
+            "limit": limit,
+            "columns": list(page.columns),
+            "rows": page.astype(object).where(page.notna(), None).to_dict("records")
         }
 
-        return month_mapping.get(month_name, "Unknown Month")
+    @staticmethod
+    def format_month(months):
+        return months.map(MONTH_FOLDERS).fillna("Unknown Month")
     
 
+#Single Purpose: To pair OneDrive files with the MAW issues they contain
+class IssueMatcher():
+
+    FUZZY_THRESHOLD = 0.5
+    FUZZY_BITS = 10
+    FUZZY_DIMENSIONS = 1 << FUZZY_BITS
+    FUZZY_CHUNK_SIZE = 2048
+
+    # "Batman v2 #012 (1987) (Digital).cbz" -> title "batman", issue "12", year "1987"
+    FILE_EXTENSION_PATTERN = r"\.[A-Za-z0-9]{2,4}$"
+    YEAR_PATTERN = r"\((\d{4})\)"
+    BRACKETED_PATTERN = r"[\(\[\{][^\)\]\}]*[\)\]\}]"
+    VOLUME_PATTERN = r"\bv(?:ol(?:ume)?)?\.?\s*\d+\b"
+    FILE_ISSUE_PATTERN = r"^(?P<title>.*?)\s*#?\s*(?P<issue>-?\d+(?:\.\d+)?[a-z]?)\s*$"
+    MAW_ISSUE_PATTERN = r"^(?P<title>.*?)\s*#\s*(?P<issue>-?[0-9]+(?:\.[0-9]+)?[a-z]?)"
+
+    @staticmethod
+    def parse_file_names(file_names):
+        names = file_names.astype("string").str.replace(IssueMatcher.FILE_EXTENSION_PATTERN, "", regex=True)
+        years = names.str.extract(IssueMatcher.YEAR_PATTERN)[0]
+        names = names.str.replace(IssueMatcher.BRACKETED_PATTERN, " ", regex=True)
+        names = names.str.replace(IssueMatcher.VOLUME_PATTERN, " ", regex=True, case=False)
+        names = names.str.replace(r"[_\s]+", " ", regex=True).str.strip().str.lower()
+        parts = names.str.extract(IssueMatcher.FILE_ISSUE_PATTERN)
+        return pd.DataFrame({
+            "Title Key": IssueMatcher.normalize_titles(parts["title"].fillna(names)),
+            "Issue Key": IssueMatcher.normalize_issues(parts["issue"]),
+            "Year Key": years
+        }, index=file_names.index)
+
+    @staticmethod
+    def parse_issue_names(issue_names, years):
+        names = issue_names.astype("string").str.replace(IssueMatcher.BRACKETED_PATTERN, " ", regex=True).str.lower()
+        parts = names.str.extract(IssueMatcher.MAW_ISSUE_PATTERN)
+        return pd.DataFrame({
+            "Title Key": IssueMatcher.normalize_titles(parts["title"].fillna(names)),
+            "Issue Key": IssueMatcher.normalize_issues(parts["issue"]),
+            "Year Key": years.astype("string")
+        }, index=issue_names.index)
+
+    @staticmethod
+    def normalize_titles(titles):
+        return titles.str.replace(r"[^a-z0-9]+", " ", regex=True).str.replace(r"^the\s+", "", regex=True).str.strip()
+
+    @staticmethod
+    def normalize_issues(issues):
+        # "012" and "12" are the same issue, "-1" and "0.5" stay as they are
+        return issues.str.replace(r"^(-?)0+(?=\d)", r"\1", regex=True)
+
+    def match(self, drive_data, maw_data):
+        # Returns (matched pairs with a Confidence column, unmatched drive rows, unmatched MAW rows)
+        files = drive_data.reset_index(drop=True)
+        issues = maw_data.reset_index(drop=True)
+        file_keys = self.parse_file_names(files["File Name"]).assign(File=files.index)
+        issue_keys = self.parse_issue_names(issues["Issue Name"], issues["Year"]).assign(Issue=issues.index)
+
+        pairs = []
+        # Exact passes, strictest first; a key only matches when it is unique on both sides
+        for keys, confidence in ((["Title Key", "Issue Key"], 1.0), (["Issue Key", "Year Key"], 0.9), (["Issue Key"], 0.8)):
+            pass_pairs = self._match_exact(file_keys, issue_keys, keys)
+            if "Title Key" not in keys and not pass_pairs.empty:
+                # Passes that ignore the title scale by how alike the titles are and drop pairs whose titles disagree
+                similarity = self._title_similarity(file_keys.set_index("File").loc[pass_pairs["File"], "Title Key"],
+                                                    issue_keys.set_index("Issue").loc[pass_pairs["Issue"], "Title Key"])
+                pass_pairs = pass_pairs.assign(Confidence=(similarity * confidence).round(3))[similarity >= IssueMatcher.FUZZY_THRESHOLD]
+            else:
+                pass_pairs = pass_pairs.assign(Confidence=confidence)
+            if not pass_pairs.empty:
+                pairs.append(pass_pairs)
+                file_keys = file_keys[~file_keys["File"].isin(pass_pairs["File"])]
+                issue_keys = issue_keys[~issue_keys["Issue"].isin(pass_pairs["Issue"])]
+
+        fuzzy_pairs = self._match_fuzzy(
+            files.loc[file_keys["File"], "File Name"], issues.loc[issue_keys["Issue"], "Issue Name"],
+            file_keys["Issue Key"], issue_keys["Issue Key"]
+        )
+        if not fuzzy_pairs.empty:
+            pairs.append(fuzzy_pairs)
+
+        pairs = pd.concat(pairs, ignore_index=True) if pairs else pd.DataFrame(columns=["File", "Issue", "Confidence"])
+        pairs = pairs.sort_values("Issue", kind="stable")
+        matched = pd.concat([
+            files.loc[pairs["File"]].reset_index(drop=True),
+            issues.loc[pairs["Issue"]].reset_index(drop=True),
+            pairs[["Confidence"]].reset_index(drop=True)
+        ], axis=1)
+        unmatched_files = files.drop(index=pairs["File"])
+        unmatched_issues = issues.drop(index=pairs["Issue"])
+        return matched, unmatched_files, unmatched_issues
+
+    @staticmethod
+    def _match_exact(file_keys, issue_keys, keys):
+        usable_files = file_keys.dropna(subset=keys)
+        usable_issues = issue_keys.dropna(subset=keys)
+        usable_files = usable_files[~usable_files.duplicated(subset=keys, keep=False)]
+        usable_issues = usable_issues[~usable_issues.duplicated(subset=keys, keep=False)]
+        return usable_files[keys + ["File"]].merge(usable_issues[keys + ["Issue"]], on=keys)[["File", "Issue"]]
+
+    def _match_fuzzy(self, file_names, issue_names, file_issue_keys, issue_issue_keys):
+        # Cosine similarity of hashed character trigrams, best unique pairs above the threshold.
+        # Two rows whose issue numbers were both parsed and differ are never paired, so the score only breaks title ties
+        if file_names.empty or issue_names.empty:
+            return pd.DataFrame(columns=["File", "Issue", "Confidence"])
+
+        file_vectors = self._trigram_vectors(file_names.str.replace(IssueMatcher.FILE_EXTENSION_PATTERN, "", regex=True))
+        issue_vectors = self._trigram_vectors(issue_names)
+        codes, _ = pd.factorize(pd.concat([file_issue_keys, issue_issue_keys], ignore_index=True))
+        file_codes, issue_codes = codes[:len(file_issue_keys)], codes[len(file_issue_keys):]
+        candidates = []
+        # Files with an issue number are only scored against issues with the same number or none; -1 is "not parsed"
+        issue_groups = IssueMatcher._group_positions(issue_codes)
+        unnumbered_issues = issue_groups.get(-1, np.empty(0, dtype=np.int64))
+        for code, file_rows in IssueMatcher._group_positions(file_codes).items():
+            issue_columns = np.arange(len(issue_codes)) if code < 0 else np.concatenate([issue_groups.get(code, unnumbered_issues[:0]), unnumbered_issues])
+            if not len(issue_columns):
+                continue
+            for start in range(0, len(file_rows), IssueMatcher.FUZZY_CHUNK_SIZE):
+                rows = file_rows[start:start + IssueMatcher.FUZZY_CHUNK_SIZE]
+                scores = file_vectors[rows] @ issue_vectors[issue_columns].T
+                best = scores.argmax(axis=1)
+                candidates.append(pd.DataFrame({
+                    "File": file_names.index[rows],
+                    "Issue": issue_names.index[issue_columns[best]],
+                    "Confidence": scores[np.arange(len(best)), best]
+                }))
+        if not candidates:
+            return pd.DataFrame(columns=["File", "Issue", "Confidence"])
+
+        candidates = pd.concat(candidates, ignore_index=True)
+        candidates = candidates[candidates["Confidence"] >= IssueMatcher.FUZZY_THRESHOLD]
+        candidates = candidates.sort_values("Confidence", ascending=False, kind="stable").drop_duplicates(subset="Issue")
+        return candidates.assign(Confidence=(candidates["Confidence"].astype(float) * 0.7).round(3))
+
+    @staticmethod
+    def _title_similarity(file_titles, issue_titles):
+        # Cosine similarity of each pair's titles; a missing title, e.g. "009.cbz" in its series folder, is no evidence either way
+        scores = (IssueMatcher._trigram_vectors(file_titles) * IssueMatcher._trigram_vectors(issue_titles)).sum(axis=1)
+        missing = file_titles.fillna("").eq("").to_numpy() | issue_titles.fillna("").eq("").to_numpy()
+        return np.where(missing, 1.0, scores.astype(float))
+
+    @staticmethod
+    def _group_positions(codes):
+        order = np.argsort(codes, kind="stable")
+        unique_codes, group_starts = np.unique(codes[order], return_index=True)
+        return dict(zip(unique_codes.tolist(), np.split(order, group_starts[1:])))
+
+    @staticmethod
+    def _trigram_vectors(names):
+        # Trigrams are packed from code points and bucketed with a fixed multiplicative hash, so scores are the same in every process
+        padded = ["  " + name + " " for name in names.astype("string").fillna("").str.lower()]
+        lengths = np.fromiter(map(len, padded), dtype=np.int64, count=len(padded))
+        codes = np.frombuffer("".join(padded).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+
+        rows = np.repeat(np.arange(len(padded)), lengths)
+        positions = np.arange(len(codes)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        starts = np.flatnonzero(positions < lengths[rows] - 2)
+        trigrams = (codes[starts] << np.uint64(42)) | (codes[starts + 1] << np.uint64(21)) | codes[starts + 2]
+        buckets = (trigrams * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(64 - IssueMatcher.FUZZY_BITS)
+
+        vectors = np.bincount(rows[starts] * IssueMatcher.FUZZY_DIMENSIONS + buckets.astype(np.int64),
+                              minlength=len(padded) * IssueMatcher.FUZZY_DIMENSIONS)
+        vectors = vectors.reshape(len(padded), IssueMatcher.FUZZY_DIMENSIONS).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+
+#Single Purpose: To create the publisher/year/month folders of the Monthly Packages tree
 class MonthlyPackageGenerator():
-    
-    def __init__(self):
-        pass
+
+    JOURNALROOT = "Journals"
+
+    def __init__(self, publisher, start_year=1960, end_year=None):
+        self.publisher = publisher
+        self.start_year = int(start_year)
+        self.end_year = int(end_year) if end_year else date.today().year
+        self.created = []
+        self.existing = []
+        self.failed = []
+
+    def get_planned_levels(self):
+        years = [str(year) for year in range(self.start_year, self.end_year + 1)]
+        return [
+            [(self.publisher,)],
+            [(self.publisher, year) for year in years],
+            [(self.publisher, year, month) for year in years for month in MONTH_FOLDERS.values()]
+        ]
+
+    def get_existing_folders(self, folder_dict):
+        existing = {}
+        pending = [((), folder_dict)]
+        while pending:
+            path, node = pending.pop()
+            for name, child in node.get('subfolders', {}).items():
+                child_path = path + (name,)
+                existing["/".join(child_path)] = child['folder_id']
+                pending.append((child_path, child))
+        return existing
+
+    def generate(self, folder_dict, batch_manager, progress=None):
+        # Only folders missing from both the tree and the journal are created, one level at a time.
+        # The journal only covers a run that was interrupted, and the live tree wins where both know a folder
+        root_folder_id = folder_dict['folder_id']
+        journal = self.load_journal(root_folder_id)
+        known = dict(journal, **self.get_existing_folders(folder_dict))
+
+        levels = self.get_planned_levels()
+        if progress:
+            progress.add_total(sum(len(level) for level in levels))
+
+        for level in levels:
+            processed_before = len(self.created) + len(self.existing)
+            failed_before = len(self.failed)
+
+            to_create = []
+            for path in level:
+                key = "/".join(path)
+                if key in known:
+                    self.existing.append(key)
+                    continue
+                parent_id = root_folder_id if len(path) == 1 else known.get("/".join(path[:-1]))
+                if parent_id is None:
+                    self.failed.append((key, "Parent folder is missing"))
+                    continue
+                to_create.append((key, parent_id, path[-1]))
+
+            if to_create:
+                self.create_folders(to_create, known, journal, batch_manager)
+                self.save_journal(root_folder_id, journal)
+
+            if progress:
+                progress.advance(
+                    done=len(self.created) + len(self.existing) - processed_before,
+                    failed=len(self.failed) - failed_before
+                )
+
+        if not self.failed:
+            self.clear_journal(root_folder_id)
+        return self.get_summary()
+
+    def create_folders(self, to_create, known, journal, batch_manager):
+        results = batch_manager.execute([self.create_folder_request(parent_id, name) for key, parent_id, name in to_create])
+        conflicts = []
+        for (key, parent_id, name), result in zip(to_create, results):
+            if result["status"] == 409:
+                conflicts.append((key, parent_id, name))
+            elif result["error"] is None:
+                known[key] = journal[key] = result["body"]["id"]
+                self.created.append(key)
+            else:
+                self.failed.append((key, result["error"]))
+
+        # Folders created outside of our view of the tree already exist, look their IDs up instead
+        if conflicts:
+            lookups = batch_manager.execute([self.get_folder_request(parent_id, name) for key, parent_id, name in conflicts])
+            for (key, parent_id, name), result in zip(conflicts, lookups):
+                if result["error"] is None:
+                    known[key] = journal[key] = result["body"]["id"]
+                    self.existing.append(key)
+                else:
+                    self.failed.append((key, result["error"]))
+
+    def get_summary(self):
+        return {
+            "created": len(self.created),
+            "existing": len(self.existing),
+            "failed": self.failed
+        }
+
+    @staticmethod
+    def create_folder_request(parent_id, name):
+        return {
+            "method": "POST",
+            "url": f"/me/drive/items/{parent_id}/children",
+            "body": {
+                "name": name,
+                "folder": {},
+                "@microsoft.graph.conflictBehavior": "fail"
+            },
+            "headers": {"Content-Type": "application/json"}
+        }
+
+    @staticmethod
+    def get_folder_request(parent_id, name):
+        return {
+            "method": "GET",
+            "url": f"/me/drive/items/{parent_id}:/{quote(name)}?$select=id,name"
+        }
+
+    def get_journal_path(self, root_folder_id):
+        return os.path.join(MonthlyPackageGenerator.JOURNALROOT, f"{storage.safe_key(root_folder_id, self.publisher)}.json")
+
+    def load_journal(self, root_folder_id):
+        journal_path = self.get_journal_path(root_folder_id)
+        if not os.path.exists(journal_path):
+            return {}
+        with open(journal_path, "r", encoding="utf-8") as journal_file:
+            return json.load(journal_file)
+
+    def save_journal(self, root_folder_id, journal):
+        journal_path = self.get_journal_path(root_folder_id)
+        os.makedirs(MonthlyPackageGenerator.JOURNALROOT, exist_ok=True)
+        storage.write_atomic(journal_path, lambda journal_file: json.dump(journal, journal_file))
+
+    def clear_journal(self, root_folder_id):
+        journal_path = self.get_journal_path(root_folder_id)
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
 
 
 class FilterManager():
@@ -139,17 +535,78 @@ class FilterManager():
     FILTER_STRINGS = ["\[Second Printing\]", "\[Variant\]", "Special", "Annual", "-1", "Comic"]
     
     def __init__(self):
-        self.filter_strings = FilterManager.FILTER_STRINGS
+        # Each term is (pattern, is_regex); copied so added terms stay with this session
+        self.filter_strings = [(string, True) for string in FilterManager.FILTER_STRINGS]
         self.filter_data = None
+        self.filter_column = None
+        self.term_masks = {}
+        self.combined_masks = {}
 
+    @instrumentation.timed("dataframe_stage_seconds", stage="filter")
     def filter(self, data, filter_column):
-        return data[~data[filter_column].str.contains('|'.join(self.filter_strings), case=False)]
+        # Masks are kept per term against the unfiltered frame, so only new terms are evaluated
+        if data is not self.filter_data or filter_column != self.filter_column:
+            self.filter_data = data
+            self.filter_column = filter_column
+            self.term_masks = {}
+            self.combined_masks = {}
+        return data[~self.get_combined_mask()]
+
+    def get_combined_mask(self):
+        key = tuple(sorted(self.filter_strings))
+        if key not in self.combined_masks:
+            mask = pd.Series(False, index=self.filter_data.index)
+            for term in self.filter_strings:
+                mask |= self.get_term_mask(term)
+            self.combined_masks[key] = mask
+        return self.combined_masks[key]
+
+    def get_term_mask(self, term):
+        if term not in self.term_masks:
+            pattern, is_regex = term
+            column = self.filter_data[self.filter_column].astype("string")
+            if is_regex:
+                matches = column.str.contains(FilterManager.compile_pattern(pattern))
+            else:
+                matches = column.str.lower().str.contains(pattern.lower(), regex=False)
+            self.term_masks[term] = matches.fillna(False).astype(bool)
+        return self.term_masks[term]
+
+    def get_state(self):
+        # Term masks as plain boolean arrays, so each web request only evaluates the terms it adds
+        if self.filter_data is None:
+            return None
+        return {
+            "filter_column": self.filter_column,
+            "term_masks": {term: mask.to_numpy() for term, mask in self.term_masks.items()}
+        }
+
+    def restore_state(self, state, data):
+        # Masks are only valid for the frame they were computed on
+        if any(len(mask) != len(data) for mask in state["term_masks"].values()):
+            return
+        self.filter_data = data
+        self.filter_column = state["filter_column"]
+        self.term_masks = {term: pd.Series(mask, index=data.index) for term, mask in state["term_masks"].items()}
+        self.combined_masks = {}
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def compile_pattern(pattern):
+        return re.compile(pattern, re.IGNORECASE)
     
-    def add_filter(self, string):
-        self.filter_strings.append(string)
+    def add_filter(self, string, is_regex=False):
+        term = (string, is_regex)
+        if term not in self.filter_strings:
+            self.filter_strings.append(term)
+
+    def remove_filter(self, string, is_regex=False):
+        term = (string, is_regex)
+        if term in self.filter_strings:
+            self.filter_strings.remove(term)
 
     def reset_filter(self):
-        self.filter_string = FilterManager.FILTER_STRINGS
+        self.filter_strings = [(string, True) for string in FilterManager.FILTER_STRINGS]
 
 class MAWDataManager():
 
@@ -157,40 +614,71 @@ class MAWDataManager():
         self.data_fetcher = MAWFetcher()
         self.seriesid = None
         self.active_data = pd.DataFrame()
+        self.unfiltered_data = self.active_data
         self.data_filter = FilterManager()
 
     def get_active_MAW_data(self):
         return self.active_data
     
-    def split_active_data_dates(self):
-        self.active_data[['Month', 'Year']] = self.active_data['Cover Date'].str.split(' ', n=1, expand=True)
-        return self.active_data
+    @staticmethod
+    def normalize_cover_dates(data):
+        # Parses "Cover Date" once into nullable integer Year and Month columns
+        parts = data['Cover Date'].astype("string").str.lower().str.extract(COVER_DATE_PATTERN)
+        normalized = data.copy()
+        normalized['Year'] = pd.to_numeric(parts['year']).astype("Int64")
+        normalized['Month'] = parts['period'].map(COVER_MONTHS).astype("Int64")
+        return normalized
 
     def load_MAW_data(self):
         if self.seriesid == None:
-            print("Series ID has not been set. Please set Series ID.")
+            logger.warning("Series ID has not been set. Please set Series ID.")
             return
         
-        if not self.has_existing_data():
+        cached_data = MAWCache.get(self.seriesid)
+        if cached_data is None:
             self.fetch_MAW_data()
         else:
-            self.active_data = self.get_MAW_data_from_csv()
+            self.active_data = cached_data
+            self.unfiltered_data = self.active_data
 
         return self.active_data
     
     def fetch_MAW_data(self):
-            if self.has_existing_data():
-                self.delete_existing_MAW_data_csv()
-
+            # write_to_csv replaces the series atomically, so the stored data is only touched once new rows came back
             self.data_fetcher.fetch()
+            if not self.data_fetcher.issues and self.has_existing_data():
+                logger.warning(f"MAW returned no issues for series {self.seriesid}, keeping the stored data")
+                self.active_data = self.normalize_cover_dates(CSVManager.get_data_from_csv(CSVManager.get_csv_from_sid(self.seriesid)))
+                self.unfiltered_data = self.active_data
+                return self.active_data
+
             self.active_data = pd.DataFrame(columns=["Issue Name", "Cover Date"])
             self.active_data["Issue Name"] = self.data_fetcher.issues
             self.active_data["Cover Date"] = self.data_fetcher.cover_dates
             self.write_MAW_data_to_csv()
+            self.active_data = self.normalize_cover_dates(self.active_data)
+            self.unfiltered_data = self.active_data
+            if not self.active_data.empty:
+                MAWCache.put(self.seriesid, self.active_data)
             return self.active_data
 
+    @staticmethod
+    def bulk_fetch_MAW_data(sids, **fetcher_options):
+        # Fetches many series concurrently and refreshes their cached CSVs; returns per-SID stats
+        def store(sid, rows):
+            # An empty page keeps the series' previous rows rather than wiping them
+            if not rows:
+                logger.warning(f"MAW returned no issues for series {sid}, keeping the stored data")
+                return
+            CSVManager.write_to_csv(sid, issueArray=[row[0] for row in rows], dateArray=[row[1] for row in rows])
+            MAWCache.invalidate(sid)
+
+        fetcher = MAWBulkFetcher(**fetcher_options)
+        results, stats = fetcher.fetch_all(sids, on_result=store)
+        return stats
+
     def filter_active_data(self):
-        self.active_data = self.data_filter.filter(self.active_data, self.active_data.columns[0])
+        self.active_data = self.data_filter.filter(self.unfiltered_data, self.unfiltered_data.columns[0])
         
     def set_series_id(self, sid):
         self.seriesid = sid
@@ -218,16 +706,119 @@ class MAWDataManager():
 
     def write_MAW_data_to_csv(self):
         if self.active_data.empty:
-            print("No active data to write to CSV, make sure this is being called only from get_MAW_data")
+            logger.warning("No active data to write to CSV, make sure this is being called only from get_MAW_data")
             return
         
         CSVManager.write_to_csv(self.seriesid, issueArray=self.active_data['Issue Name'], dateArray=self.active_data['Cover Date'])
 
+#Single Purpose: To decide whether cached MAW data is served, refreshed in the background or refetched
+class MAWCache():
+
+    TTL = timedelta(days=30)
+    SERIES_TTL = {}
+    STALE_WHILE_REVALIDATE = True
+    MEMORY_SIZE = 64
+
+    _memory = OrderedDict()
+    _refreshing = set()
+    _lock = threading.Lock()
+    _refresher = ThreadPoolExecutor(max_workers=2)
+
+    @staticmethod
+    def configure(ttl_days=None, series_ttl_days=None, stale_while_revalidate=None, memory_size=None):
+        if ttl_days is not None:
+            MAWCache.TTL = timedelta(days=ttl_days)
+        if series_ttl_days is not None:
+            MAWCache.SERIES_TTL = {sid: timedelta(days=days) for sid, days in series_ttl_days.items()}
+        if stale_while_revalidate is not None:
+            MAWCache.STALE_WHILE_REVALIDATE = stale_while_revalidate
+        if memory_size is not None:
+            MAWCache.MEMORY_SIZE = memory_size
+
+    @staticmethod
+    def get(sid):
+        # Returns normalized data, or None when the caller has to fetch (missing, or stale without SWR)
+        with MAWCache._lock:
+            entry = MAWCache._memory.get(sid)
+            if entry is not None:
+                MAWCache._memory.move_to_end(sid)
+
+        # Other workers and maw_bulk_fetch.py write to the same store, so a memory hit is only used while
+        # the store holds nothing newer; this is one primary key lookup
+        fetched_at = CSVManager.get_fetched_at(sid)
+        if entry is not None and fetched_at is not None and fetched_at > entry[0]:
+            entry = None
+
+        if entry is None:
+            if fetched_at is None:
+                instrumentation.count("maw_cache_requests_total", result="miss")
+                return None
+            data = MAWDataManager.normalize_cover_dates(CSVManager.get_data_from_csv(CSVManager.get_csv_from_sid(sid)))
+            entry = (fetched_at, data)
+            MAWCache._remember(sid, entry)
+            instrumentation.count("maw_cache_requests_total", result="store")
+        else:
+            instrumentation.count("maw_cache_requests_total", result="memory")
+
+        fetched_at, data = entry
+        if not MAWCache.is_stale(sid, fetched_at):
+            return data
+        instrumentation.count("maw_cache_requests_total", result="stale")
+        if not MAWCache.STALE_WHILE_REVALIDATE:
+            return None
+        MAWCache.schedule_refresh(sid)
+        return data
+
+    @staticmethod
+    def put(sid, data, fetched_at=None):
+        MAWCache._remember(sid, (fetched_at or datetime.now(), data))
+
+    @staticmethod
+    def invalidate(sid):
+        with MAWCache._lock:
+            MAWCache._memory.pop(sid, None)
+
+    @staticmethod
+    def is_stale(sid, fetched_at):
+        return datetime.now() - fetched_at > MAWCache.SERIES_TTL.get(sid, MAWCache.TTL)
+
+    @staticmethod
+    def schedule_refresh(sid):
+        with MAWCache._lock:
+            if sid in MAWCache._refreshing:
+                return
+            MAWCache._refreshing.add(sid)
+        MAWCache._refresher.submit(MAWCache.refresh, sid)
+
+    @staticmethod
+    def refresh(sid):
+        try:
+            fetcher = MAWFetcher(sid)
+            fetcher.fetch()
+            if fetcher.issues:
+                CSVManager.write_to_csv(sid, issueArray=fetcher.issues, dateArray=fetcher.cover_dates)
+                data = pd.DataFrame({"Issue Name": fetcher.issues, "Cover Date": fetcher.cover_dates})
+                MAWCache.put(sid, MAWDataManager.normalize_cover_dates(data))
+        except Exception as e:
+            logger.error(f"Background refresh of series {sid} failed: {e}")
+        finally:
+            with MAWCache._lock:
+                MAWCache._refreshing.discard(sid)
+
+    @staticmethod
+    def _remember(sid, entry):
+        with MAWCache._lock:
+            MAWCache._memory[sid] = entry
+            MAWCache._memory.move_to_end(sid)
+            while len(MAWCache._memory) > MAWCache.MEMORY_SIZE:
+                MAWCache._memory.popitem(last=False)
+
 class DriveDataManager():
 
     def __init__(self):
         self.active_data = pd.DataFrame()
         self.folder_dict = None
+        self.destination_index = DriveDataManager.build_destination_index(None)
         self.monthly_packages_id = None
 
     def get_active_data(self):
@@ -235,24 +826,66 @@ class DriveDataManager():
     
     def set_folder_data(self, dict):
         self.folder_dict = dict
+        self.destination_index = self.build_destination_index(dict)
         return self.folder_dict
 
+    @staticmethod
+    def build_destination_index(folder_dict):
+        # Flattens publisher/year/month into one row per month folder
+        rows = []
+        if folder_dict:
+            for publisher, publisher_folder in folder_dict['subfolders'].items():
+                for year, year_folder in publisher_folder.get('subfolders', {}).items():
+                    for month, month_folder in year_folder.get('subfolders', {}).items():
+                        rows.append((publisher, year, month, month_folder['folder_id']))
+        return pd.DataFrame(rows, columns=["Publisher", "Year", "Month", "Destination ID"])
+
+    def resolve_destinations(self, publisher, years, months):
+        requested = pd.DataFrame({"Publisher": publisher, "Year": years, "Month": months})
+        destinations = requested.merge(self.destination_index, on=["Publisher", "Year", "Month"], how="left")
+
+        missing_publisher = ~destinations["Publisher"].isin(self.destination_index["Publisher"])
+        known_years = pd.MultiIndex.from_frame(self.destination_index[["Publisher", "Year"]])
+        missing_year = ~pd.MultiIndex.from_frame(destinations[["Publisher", "Year"]]).isin(known_years)
+
+        destinations["Reason"] = None
+        destinations.loc[destinations["Destination ID"].isna(), "Reason"] = "Month not found"
+        destinations.loc[missing_year, "Reason"] = "Year not found"
+        destinations.loc[missing_publisher, "Reason"] = "Publisher not found"
+        return destinations
+
     def parse_graph_response_to_data_frame(self, drive_items):
-        data_to_concat = []
+        for _ in self.ingest_graph_pages([{"value": drive_items}]):
+            pass
+        return self.active_data
 
-        for drive_item in drive_items:
-            file_name = drive_item['name']
-            parent_ref = drive_item['parentReference']
-            folder_name = parent_ref['name']
-            file_id = drive_item['id']
+    def ingest_graph_pages(self, pages):
+        # Yields each page's rows as soon as it is parsed; active_data is replaced once the last page is in
+        frames = []
+        for page in pages:
+            with instrumentation.timer("dataframe_stage_seconds", stage="ingest_page"):
+                frame = DriveDataManager.parse_graph_page(page.get("value", []))
+            frames.append(frame)
+            yield frame
+
+        with instrumentation.timer("dataframe_stage_seconds", stage="ingest_combine"):
+            drive_data = pd.concat(frames, ignore_index=True) if frames else DriveDataManager.parse_graph_page([])
+            # Thousands of files share a handful of folders, so folder names are stored once as categories
+            drive_data["Folder Name"] = drive_data["Folder Name"].astype("category")
+            self.active_data = drive_data.sort_values(by="File Name", kind="stable", ignore_index=True)
+
+    @staticmethod
+    def parse_graph_page(drive_items):
+        columns = {"name": "File Name", "parentReference.name": "Folder Name", "id": "File ID", "parentReference.id": "Parent ID"}
+        if not drive_items:
+            return pd.DataFrame(columns=list(columns.values()), dtype=object)
+        page = pd.json_normalize(drive_items)
+        return page.reindex(columns=list(columns)).rename(columns=columns)
+
+    def set_monthly_packages_id(self, folder_id):
+        self.monthly_packages_id = folder_id
+        return self.monthly_packages_id
 
-            data_to_concat.append([file_name, folder_name, file_id])
-        
-        drive_data = pd.DataFrame(data_to_concat, columns=["File Name", "Folder Name", "File ID"])
-        drive_data = drive_data.sort_values(by="File Name")
-        self.active_data = drive_data
-        return self.active_data
-    
     def parse_graph_response_to_monthly_package_folder_id(self, drive_items):
         for drive_item in drive_items:
             if 'name' in drive_item and drive_item['name'] == "Monthly Packages":
@@ -269,51 +902,113 @@ class DriveDataManager():
         self.active_data = self.active_data.iloc[:index - 1]
         return self.active_data
 
+    def remove_entries_by_id(self, file_ids):
+        if self.active_data.empty:
+            return self.active_data
+        self.active_data = self.active_data[~self.active_data['File ID'].isin(file_ids)]
+        return self.active_data
 
+
+# Stores MAW data in one indexed SQLite file; record keys keep the legacy "<sid>_<date>.csv" names
 class CSVManager():
 
     FILEROOT = "CSVs"
+    DATABASE = "maw_data.sqlite3"
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS series (
+            sid TEXT PRIMARY KEY,
+            fetched_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS issues (
+            sid TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            issue_name TEXT,
+            cover_date TEXT,
+            PRIMARY KEY (sid, position)
+        ) WITHOUT ROWID;
+    """
+
+    _local = threading.local()
+
+    @staticmethod
+    def get_connection():
+        return storage.get_thread_connection(CSVManager._local, os.path.join(CSVManager.FILEROOT, CSVManager.DATABASE), CSVManager.SCHEMA)
 
     @staticmethod
-    def write_to_csv(sid, issueArray, dateArray):
-        fileName = "%s\%s_%s.csv" % (CSVManager.FILEROOT,sid,date.today())
-        df = pd.DataFrame({"Issue Name" : issueArray, "Cover Date" : dateArray})
-        df.to_csv(fileName, index=False)
+    @instrumentation.timed("maw_store_seconds", operation="write")
+    def write_to_csv(sid, issueArray, dateArray, fetched_at=None):
+        # Replaces the series atomically: readers see either the old or the new issue list
+        fetched_at = fetched_at or datetime.now().isoformat(timespec="seconds")
+        rows = [(sid, position, issue, cover_date) for position, (issue, cover_date) in enumerate(zip(issueArray, dateArray))]
+        connection = CSVManager.get_connection()
+        with connection:
+            connection.execute("DELETE FROM issues WHERE sid = ?", (sid,))
+            connection.executemany("INSERT INTO issues (sid, position, issue_name, cover_date) VALUES (?, ?, ?, ?)", rows)
+            connection.execute("INSERT OR REPLACE INTO series (sid, fetched_at) VALUES (?, ?)", (sid, fetched_at))
 
     @staticmethod
     def get_csv_from_sid(sid):
         if sid == None:
             return None
-        for filename in os.listdir(CSVManager.FILEROOT):
-            if filename.startswith(sid+"_"):
-                return filename
-        
-        return None
+        row = CSVManager.get_connection().execute("SELECT fetched_at FROM series WHERE sid = ?", (sid,)).fetchone()
+        if row is None:
+            return None
+        return "%s_%s.csv" % (sid, row[0][:10])
+
+    @staticmethod
+    def get_fetched_at(sid):
+        row = CSVManager.get_connection().execute("SELECT fetched_at FROM series WHERE sid = ?", (sid,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
     
     @staticmethod
     def get_creation_date_from_csv(filename):
-        namedata = filename.split("_")
+        namedata = filename.rsplit("_", 1)
         filedate = namedata[1].replace(".csv", "")
         return filedate
     
     @staticmethod
     def get_sid_from_csv(filename):
-        namedata = filename.split("_")
+        namedata = filename.rsplit("_", 1)
         filesid = namedata[0]
         return filesid
     
     @staticmethod
     def delete_csv(filename):
-        os.remove("%s\%s" % (CSVManager.FILEROOT, filename))
+        CSVManager.delete_csv_by_sid(CSVManager.get_sid_from_csv(filename))
 
     @staticmethod
     def delete_csv_by_sid(sid):
-        filename = CSVManager.get_csv_from_sid(sid)
-        if filename == None:
-            return
-        CSVManager.delete_csv(filename)
+        connection = CSVManager.get_connection()
+        with connection:
+            connection.execute("DELETE FROM issues WHERE sid = ?", (sid,))
+            connection.execute("DELETE FROM series WHERE sid = ?", (sid,))
     
     @staticmethod
+    @instrumentation.timed("maw_store_seconds", operation="read")
     def get_data_from_csv(filename):
-        data = pd.read_csv("%s\%s" % (CSVManager.FILEROOT, filename))
-        return data
\ No newline at end of file
+        rows = CSVManager.get_connection().execute(
+            "SELECT issue_name, cover_date FROM issues WHERE sid = ? ORDER BY position",
+            (CSVManager.get_sid_from_csv(filename),)
+        ).fetchall()
+        data = pd.DataFrame(rows, columns=["Issue Name", "Cover Date"])
+        return data
+
+    @staticmethod
+    def migrate_csvs(remove=False):
+        # One-shot import of the legacy per-series CSV files; newer database entries are kept
+        migrated = []
+        for filename in sorted(os.listdir(CSVManager.FILEROOT)):
+            if not filename.endswith(".csv") or "_" not in filename:
+                continue
+            sid = CSVManager.get_sid_from_csv(filename)
+            fetched_at = CSVManager.get_creation_date_from_csv(filename)
+            existing = CSVManager.get_fetched_at(sid)
+            path = os.path.join(CSVManager.FILEROOT, filename)
+
+            if existing is None or existing.date().isoformat() < fetched_at:
+                data = pd.read_csv(path, dtype=str, keep_default_na=False)
+                CSVManager.write_to_csv(sid, issueArray=data["Issue Name"], dateArray=data["Cover Date"], fetched_at=fetched_at + "T00:00:00")
+                migrated.append(sid)
+            if remove:
+                os.remove(path)
+        return migrated